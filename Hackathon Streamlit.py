@@ -1,6 +1,9 @@
 # Social Media Analytics Dashboard
 # DataSculpt Hackathon 2025
 
+import uuid
+from concurrent.futures import wait
+
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -10,6 +13,26 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from dashboard_data import (
+    load_data as _load_data,
+    dataset_version,
+    filter_mask,
+    apply_filters,
+    kpi_summary,
+    value_counts_frame,
+    group_mean_frame,
+    crosstab_frame,
+    cohort_aggregates,
+    COHORT_KPIS,
+    COHORT_BREAKDOWNS,
+)
+from heavy_hitters import HeavyHitterIndex
+from contingency import ContingencyTensor, PIVOT_DIMENSIONS, PIVOT_METRICS
+from memory_budget import RerunLedger, SessionRegistry, estimate_size, MB
+from segmentation import SegmentationJobs, SEGMENT_FEATURES
+from confidence import mean_intervals, attach_error_bars, format_interval
+from record_browser import SortIndex, fetch_page, n_pages, PAGE_SIZES
+
 # Set page configuration
 st.set_page_config(
     page_title="Social Media Analytics Dashboard",
@@ -62,20 +85,42 @@ st.markdown("---")
 # Load the data
 @st.cache_data
 def load_data():
-    df = pd.read_csv('Time-Wasters on Social Media.csv')
-    # Basic cleaning
-    df['Debt'] = df['Debt'].astype(bool)
-    df['Owns Property'] = df['Owns Property'].astype(bool)
-    
-    # Create Age Group column
-    age_bins = [0, 18, 25, 35, 45, 55, 65, 100]
-    age_labels = ['Under 18', '18-24', '25-34', '35-44', '45-54', '55-64', '65+']
-    df['Age Group'] = pd.cut(df['Age'], bins=age_bins, labels=age_labels, right=False)
-    
-    return df
+    return _load_data()
 
 df = load_data()
 
+# Top-K summaries per filter cell for high-cardinality columns
+@st.cache_resource
+def load_heavy_hitters():
+    return HeavyHitterIndex(load_data())
+
+heavy_hitters = load_heavy_hitters()
+
+# Sparse contingency tensors (one per pivot combination) for the pivot explorer
+@st.cache_resource
+def load_contingency_tensor():
+    return ContingencyTensor(load_data())
+
+contingency_tensor = load_contingency_tensor()
+
+# Background user segmentation, cached per dataset version
+@st.cache_data
+def load_dataset_version():
+    return dataset_version()
+
+@st.cache_resource
+def load_segmentation_jobs():
+    return SegmentationJobs()
+
+segmentation_jobs = load_segmentation_jobs()
+
+# Cached per-column sort orders for the record browser
+@st.cache_resource
+def load_sort_index():
+    return SortIndex()
+
+sort_index = load_sort_index()
+
 # Sidebar for filters
 st.sidebar.markdown("## 🔍 Filters")
 
@@ -97,14 +142,35 @@ locations = ['All'] + sorted(df['Location'].unique().tolist())
 selected_location = st.sidebar.selectbox("Select Location", locations)
 
 # Apply filters
-filtered_df = df.copy()
-if selected_platform != 'All':
-    filtered_df = filtered_df[filtered_df['Platform'] == selected_platform]
-filtered_df = filtered_df[(filtered_df['Age'] >= age_range[0]) & (filtered_df['Age'] <= age_range[1])]
-if selected_gender != 'All':
-    filtered_df = filtered_df[filtered_df['Gender'] == selected_gender]
-if selected_location != 'All':
-    filtered_df = filtered_df[filtered_df['Location'] == selected_location]
+current_mask = filter_mask(df, selected_platform, age_range, selected_gender, selected_location)
+filtered_df = df[current_mask]
+current_filters = dict(platform=selected_platform, age_range=age_range, gender=selected_gender, location=selected_location)
+
+# Confidence intervals for the KPI cards and platform comparisons, cached per
+# filter state; age-slider drags create many states, so only recent ones are kept
+@st.cache_data(max_entries=256)
+def load_intervals(platform, age_range, gender, location):
+    filtered = apply_filters(load_data(), platform, age_range, gender, location)
+    return {
+        'kpis': mean_intervals(filtered, ['Total Time Spent', 'Satisfaction', 'Addiction Level']),
+        'platform': mean_intervals(filtered, ['Total Time Spent', 'ProductivityLoss', 'Engagement'], groups='Platform'),
+    }
+
+intervals = load_intervals(selected_platform, age_range, selected_gender, selected_location)
+
+# Memory accounting and admission control, shared by all sessions in the process
+@st.cache_resource
+def load_memory_registry():
+    return SessionRegistry()
+
+memory_registry = load_memory_registry()
+if 'session_id' not in st.session_state:
+    st.session_state['session_id'] = uuid.uuid4().hex
+rerun_ledger = RerunLedger(st.session_state['session_id'])
+rerun_ledger.track('filtered_df', filtered_df)
+admission = memory_registry.admit(rerun_ledger, estimate_size(st.session_state.to_dict()))
+if rerun_ledger.degraded:
+    st.warning(f"⚠️ The dashboard is under memory pressure ({admission['reason']}). Scatter plots are shown in aggregated mode.")
 
 # Display filter summary
 st.sidebar.markdown("### Applied Filters:")
@@ -114,33 +180,110 @@ st.sidebar.markdown(f"**Gender:** {selected_gender}")
 st.sidebar.markdown(f"**Location:** {selected_location}")
 st.sidebar.markdown(f"**Filtered Data Size:** {filtered_df.shape[0]} records")
 
+# Cohort comparison mode
+st.sidebar.markdown("## 🆚 Compare Cohorts")
+compare_mode = st.sidebar.checkbox("Enable comparison mode")
+cohorts = []
+if compare_mode:
+    n_cohorts = st.sidebar.slider("Number of Cohorts", 2, 4, 2)
+    for i in range(n_cohorts):
+        with st.sidebar.expander(f"Cohort {i + 1}", expanded=i < 2):
+            # Default each cohort to a different platform
+            cohort_platform = st.selectbox("Platform", platforms, index=i % (len(platforms) - 1) + 1, key=f"cohort_{i}_platform")
+            cohort_age = st.slider("Age Range", min_age, max_age, (min_age, max_age), key=f"cohort_{i}_age")
+            cohort_gender = st.selectbox("Gender", genders, key=f"cohort_{i}_gender")
+            cohort_location = st.selectbox("Location", locations, key=f"cohort_{i}_location")
+        cohorts.append({
+            'platform': cohort_platform,
+            'age_range': None if cohort_age == (min_age, max_age) else cohort_age,
+            'gender': cohort_gender,
+            'location': cohort_location,
+        })
+
 # Overview section
 st.markdown("<h2 class='sub-header'>📊 Platform Overview</h2>", unsafe_allow_html=True)
 
 # KPI cards in row
+kpis = kpi_summary(filtered_df)
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
     st.markdown("### Total Users")
-    st.markdown(f"<h2 style='text-align: center; color: #1E88E5;'>{filtered_df.shape[0]}</h2>", unsafe_allow_html=True)
+    st.markdown(f"<h2 style='text-align: center; color: #1E88E5;'>{kpis['total_users']}</h2>", unsafe_allow_html=True)
 
 with col2:
-    avg_time = round(filtered_df['Total Time Spent'].mean(), 2)
+    avg_time = kpis['avg_time']
     st.markdown("### Avg. Time Spent")
     st.markdown(f"<h2 style='text-align: center; color: #1E88E5;'>{avg_time} min</h2>", unsafe_allow_html=True)
+    st.markdown(f"<p style='text-align: center; color: #757575;'>{format_interval(intervals['kpis']['Total Time Spent'])}</p>", unsafe_allow_html=True)
 
 with col3:
-    avg_satisfaction = round(filtered_df['Satisfaction'].mean(), 2)
+    avg_satisfaction = kpis['avg_satisfaction']
     st.markdown("### Avg. Satisfaction")
     st.markdown(f"<h2 style='text-align: center; color: #1E88E5;'>{avg_satisfaction}/10</h2>", unsafe_allow_html=True)
+    st.markdown(f"<p style='text-align: center; color: #757575;'>{format_interval(intervals['kpis']['Satisfaction'])}</p>", unsafe_allow_html=True)
 
 with col4:
-    avg_addiction = round(filtered_df['Addiction Level'].mean(), 2)
+    avg_addiction = kpis['avg_addiction']
     st.markdown("### Avg. Addiction Level")
     st.markdown(f"<h2 style='text-align: center; color: #1E88E5;'>{avg_addiction}/10</h2>", unsafe_allow_html=True)
+    st.markdown(f"<p style='text-align: center; color: #757575;'>{format_interval(intervals['kpis']['Addiction Level'])}</p>", unsafe_allow_html=True)
 
 st.markdown("---")
 
+# Cohort Comparison Section
+if compare_mode:
+    st.markdown("<h2 class='sub-header'>🆚 Cohort Comparison</h2>", unsafe_allow_html=True)
+
+    # All cohorts are labeled and aggregated together in one pass over the data
+    comparison = rerun_ledger.track('cohort_comparison', cohort_aggregates(df, cohorts))
+    cohort_kpis = comparison['kpis']
+    baseline = cohort_kpis.iloc[0]
+
+    # Delta KPI cards relative to the first cohort
+    for i, (name, row) in enumerate(cohort_kpis.iterrows()):
+        st.markdown(f"**{name}**")
+        kpi_cols = st.columns(len(COHORT_KPIS))
+        for col, kpi in zip(kpi_cols, COHORT_KPIS):
+            value = row[kpi]
+            delta = None if i == 0 or pd.isna(value) or pd.isna(baseline[kpi]) else value - baseline[kpi]
+            if kpi == 'Users':
+                col.metric(kpi, int(value), delta=None if delta is None else int(delta))
+            else:
+                col.metric(kpi, '–' if pd.isna(value) else f"{value:.2f}", delta=None if delta is None else f"{delta:+.2f}")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        fig_cohort_scores = px.bar(
+            comparison['means'],
+            x='Metric',
+            y='Average',
+            color='Cohort',
+            barmode='group',
+            title='Average Scores by Cohort (1-10)',
+            color_discrete_sequence=px.colors.qualitative.Bold
+        )
+        fig_cohort_scores.update_layout(height=400)
+        st.plotly_chart(rerun_ledger.track('fig_cohort_scores', fig_cohort_scores), use_container_width=True)
+
+    with col2:
+        breakdown = st.selectbox("Compare Breakdown By", COHORT_BREAKDOWNS, index=1)
+        fig_cohort_share = px.bar(
+            comparison['shares'][breakdown],
+            x=breakdown,
+            y='Share',
+            color='Cohort',
+            barmode='group',
+            title=f'Share of Users by {breakdown} (%)',
+            hover_data=['Count'],
+            color_discrete_sequence=px.colors.qualitative.Bold
+        )
+        fig_cohort_share.update_layout(height=400)
+        st.plotly_chart(rerun_ledger.track('fig_cohort_share', fig_cohort_share), use_container_width=True)
+
+    st.markdown("---")
+
 # User Demographics Section
 st.markdown("<h2 class='sub-header'>👥 User Demographics</h2>", unsafe_allow_html=True)
 
@@ -158,12 +301,11 @@ with col1:
         opacity=0.8
     )
     fig_age.update_layout(height=400)
-    st.plotly_chart(fig_age, use_container_width=True)
+    st.plotly_chart(rerun_ledger.track('fig_age', fig_age), use_container_width=True)
 
 with col2:
     # Gender distribution
-    gender_counts = filtered_df['Gender'].value_counts().reset_index()
-    gender_counts.columns = ['Gender', 'Count']
+    gender_counts = value_counts_frame(filtered_df, 'Gender')
     
     fig_gender = px.pie(
         gender_counts, 
@@ -174,14 +316,14 @@ with col2:
         color_discrete_sequence=px.colors.qualitative.Set2
     )
     fig_gender.update_layout(height=400)
-    st.plotly_chart(fig_gender, use_container_width=True)
+    st.plotly_chart(rerun_ledger.track('fig_gender', fig_gender), use_container_width=True)
 
 col1, col2 = st.columns(2)
 
 with col1:
     # Location map
-    location_counts = filtered_df['Location'].value_counts().reset_index()
-    location_counts.columns = ['Location', 'Count']
+    location_counts = heavy_hitters.top_k('location', len(locations), **current_filters)
+    location_counts = location_counts.rename(columns={'item': 'Location', 'count': 'Count'})
     
     fig_location = px.choropleth(
         location_counts,
@@ -193,13 +335,13 @@ with col1:
         title='User Distribution by Country',
     )
     fig_location.update_layout(height=400, geo=dict(showframe=False, showcoastlines=True))
-    st.plotly_chart(fig_location, use_container_width=True)
+    st.plotly_chart(rerun_ledger.track('fig_location', fig_location), use_container_width=True)
 
 with col2:
     # Profession distribution
-    profession_counts = filtered_df['Profession'].value_counts().reset_index()
-    profession_counts.columns = ['Profession', 'Count']
-    profession_counts = profession_counts.sort_values('Count', ascending=True).tail(10)
+    profession_counts = heavy_hitters.top_k('profession', 10, **current_filters)
+    profession_counts = profession_counts.rename(columns={'item': 'Profession', 'count': 'Count'})
+    profession_counts = profession_counts.sort_values('Count', ascending=True)
     
     fig_profession = px.bar(
         profession_counts,
@@ -211,7 +353,7 @@ with col2:
         color_continuous_scale='Blues'
     )
     fig_profession.update_layout(height=400)
-    st.plotly_chart(fig_profession, use_container_width=True)
+    st.plotly_chart(rerun_ledger.track('fig_profession', fig_profession), use_container_width=True)
 
 st.markdown("---")
 
@@ -223,8 +365,7 @@ col1, col2 = st.columns(2)
 with col1:
     # Platform usage count
     if selected_platform == 'All':
-        platform_counts = filtered_df['Platform'].value_counts().reset_index()
-        platform_counts.columns = ['Platform', 'Count']
+        platform_counts = value_counts_frame(filtered_df, 'Platform')
         
         fig_platform = px.bar(
             platform_counts, 
@@ -235,32 +376,33 @@ with col1:
             color_discrete_sequence=px.colors.qualitative.Bold
         )
         fig_platform.update_layout(height=400)
-        st.plotly_chart(fig_platform, use_container_width=True)
+        st.plotly_chart(rerun_ledger.track('fig_platform', fig_platform), use_container_width=True)
     else:
         st.info(f"Filter is set to {selected_platform} only.")
 
 with col2:
     # Time spent by platform
-    platform_time = filtered_df.groupby('Platform')['Total Time Spent'].mean().reset_index()
-    platform_time = platform_time.sort_values('Total Time Spent', ascending=False)
+    platform_time = group_mean_frame(filtered_df, 'Platform', 'Total Time Spent')
+    platform_time = attach_error_bars(platform_time, intervals['platform']['Total Time Spent'], 'Platform', 'Total Time Spent')
     
     fig_time = px.bar(
         platform_time, 
         x='Platform', 
         y='Total Time Spent',
+        error_y='CI Upper',
+        error_y_minus='CI Lower',
         title='Average Time Spent by Platform (minutes)',
         color='Platform',
         color_discrete_sequence=px.colors.qualitative.Bold
     )
     fig_time.update_layout(height=400)
-    st.plotly_chart(fig_time, use_container_width=True)
+    st.plotly_chart(rerun_ledger.track('fig_time', fig_time), use_container_width=True)
 
 col1, col2 = st.columns(2)
 
 with col1:
     # Device type usage
-    device_counts = filtered_df['DeviceType'].value_counts().reset_index()
-    device_counts.columns = ['DeviceType', 'Count']
+    device_counts = value_counts_frame(filtered_df, 'DeviceType')
     
     fig_device = px.pie(
         device_counts, 
@@ -270,12 +412,11 @@ with col1:
         color_discrete_sequence=px.colors.qualitative.Pastel
     )
     fig_device.update_layout(height=400)
-    st.plotly_chart(fig_device, use_container_width=True)
+    st.plotly_chart(rerun_ledger.track('fig_device', fig_device), use_container_width=True)
 
 with col2:
     # Operating Systems
-    os_counts = filtered_df['OS'].value_counts().reset_index()
-    os_counts.columns = ['OS', 'Count']
+    os_counts = value_counts_frame(filtered_df, 'OS')
     
     fig_os = px.pie(
         os_counts, 
@@ -285,7 +426,7 @@ with col2:
         color_discrete_sequence=px.colors.qualitative.Pastel
     )
     fig_os.update_layout(height=400)
-    st.plotly_chart(fig_os, use_container_width=True)
+    st.plotly_chart(rerun_ledger.track('fig_os', fig_os), use_container_width=True)
 
 st.markdown("---")
 
@@ -296,8 +437,7 @@ col1, col2 = st.columns(2)
 
 with col1:
     # Video category popularity
-    category_counts = filtered_df['Video Category'].value_counts().reset_index()
-    category_counts.columns = ['Video Category', 'Count']
+    category_counts = value_counts_frame(filtered_df, 'Video Category')
     category_counts = category_counts.sort_values('Count', ascending=False)
     
     fig_category = px.bar(
@@ -309,12 +449,11 @@ with col1:
         color_continuous_scale='Viridis'
     )
     fig_category.update_layout(height=450)
-    st.plotly_chart(fig_category, use_container_width=True)
+    st.plotly_chart(rerun_ledger.track('fig_category', fig_category), use_container_width=True)
 
 with col2:
     # Engagement by video category
-    category_engagement = filtered_df.groupby('Video Category')['Engagement'].mean().reset_index()
-    category_engagement = category_engagement.sort_values('Engagement', ascending=False)
+    category_engagement = group_mean_frame(filtered_df, 'Video Category', 'Engagement')
     
     fig_engagement = px.bar(
         category_engagement, 
@@ -325,25 +464,68 @@ with col2:
         color_continuous_scale='Viridis'
     )
     fig_engagement.update_layout(height=450)
-    st.plotly_chart(fig_engagement, use_container_width=True)
+    st.plotly_chart(rerun_ledger.track('fig_engagement', fig_engagement), use_container_width=True)
 
 # Video Length vs Time Spent
-fig_video_time = px.scatter(
-    filtered_df,
-    x='Video Length',
-    y='Time Spent On Video',
-    color='Platform' if selected_platform == 'All' else None,
-    size='Engagement',
-    hover_data=['Video Category'],
-    title='Video Length vs Time Spent Watching',
-    labels={
-        'Video Length': 'Video Length (minutes)',
-        'Time Spent On Video': 'Time Spent Watching (minutes)'
-    },
-    opacity=0.7
-)
+if rerun_ledger.degraded:
+    # Aggregated mode: binned counts instead of one marker per user
+    fig_video_time = px.density_heatmap(
+        filtered_df,
+        x='Video Length',
+        y='Time Spent On Video',
+        title='Video Length vs Time Spent Watching (aggregated)',
+        labels={
+            'Video Length': 'Video Length (minutes)',
+            'Time Spent On Video': 'Time Spent Watching (minutes)'
+        },
+        color_continuous_scale='Viridis'
+    )
+else:
+    fig_video_time = px.scatter(
+        filtered_df,
+        x='Video Length',
+        y='Time Spent On Video',
+        color='Platform' if selected_platform == 'All' else None,
+        size='Engagement',
+        hover_data=['Video Category'],
+        title='Video Length vs Time Spent Watching',
+        labels={
+            'Video Length': 'Video Length (minutes)',
+            'Time Spent On Video': 'Time Spent Watching (minutes)'
+        },
+        opacity=0.7
+    )
 fig_video_time.update_layout(height=500)
-st.plotly_chart(fig_video_time, use_container_width=True)
+st.plotly_chart(rerun_ledger.track('fig_video_time', fig_video_time), use_container_width=True)
+
+# Top Videos
+st.markdown("<h3 class='section-header'>🔥 Top Videos</h3>", unsafe_allow_html=True)
+st.caption("Ranked from mergeable top-K summaries. Error bars show the range the true value is guaranteed to lie in.")
+
+col1, col2 = st.columns(2)
+
+for col, summary_name, value_label, title in (
+    (col1, 'video_views', 'Views', 'Top 10 Videos by Views'),
+    (col2, 'video_engagement', 'Total Engagement', 'Top 10 Videos by Total Engagement'),
+):
+    with col:
+        top_videos = heavy_hitters.top_k(summary_name, 10, **current_filters)
+        top_videos['Video'] = 'Video ' + top_videos['item'].astype(str)
+        top_videos = top_videos.rename(columns={'count': value_label})
+
+        fig_top_videos = px.bar(
+            top_videos,
+            x='Video',
+            y=value_label,
+            error_y=np.zeros(len(top_videos)),
+            error_y_minus='error',
+            hover_data={'lower': True, 'guaranteed': True},
+            title=title,
+            color=value_label,
+            color_continuous_scale='Viridis'
+        )
+        fig_top_videos.update_layout(height=400)
+        st.plotly_chart(rerun_ledger.track(f'fig_top_{summary_name}', fig_top_videos), use_container_width=True)
 
 st.markdown("---")
 
@@ -354,8 +536,7 @@ col1, col2 = st.columns(2)
 
 with col1:
     # Watch reasons
-    reason_counts = filtered_df['Watch Reason'].value_counts().reset_index()
-    reason_counts.columns = ['Watch Reason', 'Count']
+    reason_counts = value_counts_frame(filtered_df, 'Watch Reason')
     
     fig_reason = px.pie(
         reason_counts, 
@@ -365,12 +546,11 @@ with col1:
         color_discrete_sequence=px.colors.qualitative.Set3
     )
     fig_reason.update_layout(height=400)
-    st.plotly_chart(fig_reason, use_container_width=True)
+    st.plotly_chart(rerun_ledger.track('fig_reason', fig_reason), use_container_width=True)
 
 with col2:
     # Watch time distribution
-    time_counts = filtered_df['Watch Time'].value_counts().reset_index()
-    time_counts.columns = ['Watch Time', 'Count']
+    time_counts = value_counts_frame(filtered_df, 'Watch Time')
     
     # Sort by time (Morning, Afternoon, Evening, Night)
     time_order = {"8:00 AM": 1, "2:00 PM": 2, "5:00 PM": 3, "9:00 PM": 4}
@@ -386,39 +566,215 @@ with col2:
         color_discrete_sequence=px.colors.qualitative.Set3
     )
     fig_watch_time.update_layout(height=400)
-    st.plotly_chart(fig_watch_time, use_container_width=True)
+    st.plotly_chart(rerun_ledger.track('fig_watch_time', fig_watch_time), use_container_width=True)
 
 col1, col2 = st.columns(2)
 
 with col1:
     # Self Control vs Addiction Level
-    fig_control = px.scatter(
-        filtered_df, 
-        x='Self Control', 
-        y='Addiction Level',
-        color='Platform' if selected_platform == 'All' else None,
-        title='Self Control vs Addiction Level',
-        labels={'Self Control': 'Self Control (1-10)', 'Addiction Level': 'Addiction Level (0-10)'},
-        opacity=0.7
-    )
+    if rerun_ledger.degraded:
+        fig_control = px.density_heatmap(
+            filtered_df,
+            x='Self Control',
+            y='Addiction Level',
+            title='Self Control vs Addiction Level (aggregated)',
+            labels={'Self Control': 'Self Control (1-10)', 'Addiction Level': 'Addiction Level (0-10)'},
+            color_continuous_scale='Viridis'
+        )
+    else:
+        fig_control = px.scatter(
+            filtered_df, 
+            x='Self Control', 
+            y='Addiction Level',
+            color='Platform' if selected_platform == 'All' else None,
+            title='Self Control vs Addiction Level',
+            labels={'Self Control': 'Self Control (1-10)', 'Addiction Level': 'Addiction Level (0-10)'},
+            opacity=0.7
+        )
     fig_control.update_layout(height=400)
-    st.plotly_chart(fig_control, use_container_width=True)
+    st.plotly_chart(rerun_ledger.track('fig_control', fig_control), use_container_width=True)
 
 with col2:
     # Productivity Loss by Platform
-    platform_productivity = filtered_df.groupby('Platform')['ProductivityLoss'].mean().reset_index()
-    platform_productivity = platform_productivity.sort_values('ProductivityLoss', ascending=False)
+    platform_productivity = group_mean_frame(filtered_df, 'Platform', 'ProductivityLoss')
+    platform_productivity = attach_error_bars(platform_productivity, intervals['platform']['ProductivityLoss'], 'Platform', 'ProductivityLoss')
     
     fig_productivity = px.bar(
         platform_productivity, 
         x='Platform', 
         y='ProductivityLoss',
+        error_y='CI Upper',
+        error_y_minus='CI Lower',
         title='Average Productivity Loss by Platform (1-10)',
         color='Platform',
         color_discrete_sequence=px.colors.qualitative.Set1
     )
     fig_productivity.update_layout(height=400)
-    st.plotly_chart(fig_productivity, use_container_width=True)
+    st.plotly_chart(rerun_ledger.track('fig_productivity', fig_productivity), use_container_width=True)
+
+st.markdown("---")
+
+# Pivot Explorer
+st.markdown("<h2 class='sub-header'>🧮 Pivot Explorer</h2>", unsafe_allow_html=True)
+
+col1, col2, col3 = st.columns([2, 1, 1])
+
+with col1:
+    pivot_dims = st.multiselect(
+        "Dimensions (pick 2 or 3)",
+        PIVOT_DIMENSIONS,
+        default=['Platform', 'Video Category'],
+        max_selections=3
+    )
+with col2:
+    pivot_metric = st.selectbox("Metric", ['Users'] + PIVOT_METRICS)
+with col3:
+    pivot_agg = st.radio("Aggregation", ['Average', 'Total'], horizontal=True, disabled=pivot_metric == 'Users')
+
+if len(pivot_dims) < 2:
+    st.info("Select at least two dimensions to build a pivot.")
+else:
+    # Answered from the cached tensor for these dimensions, sliced by the sidebar filters
+    pivot = contingency_tensor.pivot(
+        pivot_dims,
+        None if pivot_metric == 'Users' else pivot_metric,
+        **current_filters
+    )
+    rerun_ledger.track('pivot', pivot)
+    value_col = 'Users' if pivot_metric == 'Users' else pivot_agg
+    value_label = 'Users' if pivot_metric == 'Users' else f"{pivot_agg} {pivot_metric}"
+
+    if len(pivot_dims) == 2:
+        pivot_table = pivot.pivot(index=pivot_dims[0], columns=pivot_dims[1], values=value_col)
+        fig_pivot = px.imshow(
+            pivot_table,
+            labels=dict(x=pivot_dims[1], y=pivot_dims[0], color=value_label),
+            title=f"{value_label} by {pivot_dims[0]} and {pivot_dims[1]}",
+            color_continuous_scale="Blues",
+            aspect="auto"
+        )
+    else:
+        fig_pivot = px.bar(
+            pivot,
+            x=pivot_dims[0],
+            y=value_col,
+            color=pivot_dims[1],
+            facet_col=pivot_dims[2],
+            facet_col_wrap=3,
+            barmode='group',
+            labels={value_col: value_label},
+            title=f"{value_label} by {', '.join(pivot_dims)}"
+        )
+    fig_pivot.update_layout(height=500)
+    st.plotly_chart(rerun_ledger.track('fig_pivot', fig_pivot), use_container_width=True)
+
+    with st.expander("Show pivot table"):
+        st.dataframe(pivot.pivot_table(index=pivot_dims[:-1], columns=pivot_dims[-1], values=value_col), use_container_width=True)
+
+st.markdown("---")
+
+# User Segments
+st.markdown("<h2 class='sub-header'>🧩 User Segments</h2>", unsafe_allow_html=True)
+
+n_segments = st.slider("Number of Segments", 2, 8, 4)
+segment_job = segmentation_jobs.submit(load_dataset_version(), n_segments)
+# Small datasets finish almost immediately; large fits keep running in the
+# background without holding up the rerun
+wait([segment_job], timeout=0.2)
+
+if not segment_job.done():
+    st.info("Segments are being fitted in the background and will appear once ready.")
+    st.button("Refresh Segments")
+elif segment_job.exception() is not None:
+    st.error(f"Segmentation failed: {segment_job.exception()}")
+else:
+    segmentation = segment_job.result()
+    segment_labels = pd.Series(
+        np.asarray(segmentation.names)[segmentation.labels[filtered_df.index.to_numpy()]],
+        index=filtered_df.index,
+        name='Segment'
+    )
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Segment sizes under the current filters
+        segment_sizes = segment_labels.value_counts().reindex(segmentation.names, fill_value=0).reset_index()
+        segment_sizes.columns = ['Segment', 'Users']
+
+        fig_segment_sizes = px.bar(
+            segment_sizes,
+            x='Users',
+            y='Segment',
+            orientation='h',
+            title='Segment Sizes',
+            color='Segment',
+            color_discrete_sequence=px.colors.qualitative.Bold
+        )
+        fig_segment_sizes.update_layout(height=450, showlegend=False)
+        st.plotly_chart(rerun_ledger.track('fig_segment_sizes', fig_segment_sizes), use_container_width=True)
+
+    with col2:
+        # Segment profiles: color is the standardized mean, text the raw mean
+        segment_profiles = filtered_df[SEGMENT_FEATURES].groupby(segment_labels).mean().reindex(segmentation.names)
+        segment_z = (segment_profiles - segmentation.mean) / segmentation.std
+
+        fig_segment_profiles = px.imshow(
+            segment_z,
+            labels=dict(x="Feature", y="Segment", color="Std. from mean"),
+            title="Segment Profiles",
+            color_continuous_scale="RdBu_r",
+            color_continuous_midpoint=0,
+            aspect="auto"
+        )
+        fig_segment_profiles.update_traces(text=segment_profiles.round(1).to_numpy(), texttemplate='%{text}')
+        fig_segment_profiles.update_layout(height=450)
+        st.plotly_chart(rerun_ledger.track('fig_segment_profiles', fig_segment_profiles), use_container_width=True)
+
+st.markdown("---")
+
+# Record Browser
+st.markdown("<h2 class='sub-header'>🗂️ Record Browser</h2>", unsafe_allow_html=True)
+
+all_columns = df.columns.tolist()
+browser_columns = st.multiselect(
+    "Columns",
+    all_columns,
+    default=['UserID', 'Age', 'Gender', 'Location', 'Platform', 'Video Category', 'Total Time Spent', 'Engagement']
+)
+
+col1, col2, col3, col4 = st.columns(4)
+
+with col1:
+    browser_sort = st.selectbox("Sort By", ['(none)'] + all_columns)
+with col2:
+    browser_order = st.radio("Order", ['Ascending', 'Descending'], horizontal=True, disabled=browser_sort == '(none)')
+with col3:
+    browser_page_size = st.selectbox("Rows per Page", PAGE_SIZES)
+
+# Only the visible page is fetched, from the filter mask and the cached sort order
+browser_total = int(current_mask.sum())
+browser_pages = n_pages(browser_total, browser_page_size)
+with col4:
+    browser_page = st.number_input("Page", min_value=1, max_value=browser_pages, value=1, step=1)
+
+if not browser_columns:
+    st.info("Select at least one column to browse records.")
+else:
+    record_page, _ = fetch_page(
+        df,
+        current_mask,
+        int(browser_page) - 1,
+        browser_page_size,
+        browser_columns,
+        sort_index,
+        None if browser_sort == '(none)' else browser_sort,
+        descending=browser_order == 'Descending'
+    )
+    rerun_ledger.track('record_page', record_page)
+    first_row = (int(browser_page) - 1) * browser_page_size
+    st.caption(f"Showing records {min(first_row + 1, browser_total)}–{first_row + len(record_page)} of {browser_total} (page {int(browser_page)} of {browser_pages})")
+    st.dataframe(record_page, use_container_width=True, hide_index=True)
 
 st.markdown("---")
 
@@ -435,8 +791,7 @@ with tab1:
     
     with col1:
         # Connection Type Analysis
-        connection_counts = filtered_df['ConnectionType'].value_counts().reset_index()
-        connection_counts.columns = ['ConnectionType', 'Count']
+        connection_counts = value_counts_frame(filtered_df, 'ConnectionType')
         
         fig_connection = px.pie(
             connection_counts,
@@ -445,13 +800,14 @@ with tab1:
             title='Internet Connection Type Distribution',
             color_discrete_sequence=px.colors.qualitative.Pastel
         )
-        st.plotly_chart(fig_connection, use_container_width=True)
+        st.plotly_chart(rerun_ledger.track('fig_connection', fig_connection), use_container_width=True)
         
     with col2:
         # Platform by Device Type
-        platform_device = pd.crosstab(filtered_df['Platform'], filtered_df['DeviceType'])
+        platform_device = crosstab_frame(filtered_df, 'Platform', 'DeviceType')
         platform_device = platform_device.reset_index()
         platform_device_melt = pd.melt(platform_device, id_vars=['Platform'], var_name='DeviceType', value_name='Count')
+        rerun_ledger.track('platform_device_melt', platform_device_melt)
         
         fig_platform_device = px.bar(
             platform_device_melt,
@@ -461,7 +817,7 @@ with tab1:
             title='Platform Usage by Device Type',
             barmode='group'
         )
-        st.plotly_chart(fig_platform_device, use_container_width=True)
+        st.plotly_chart(rerun_ledger.track('fig_platform_device', fig_platform_device), use_container_width=True)
     
     # Key insights
     st.markdown("<div class='insight-text'>", unsafe_allow_html=True)
@@ -481,23 +837,24 @@ with tab2:
     
     with col1:
         # Engagement by platform
-        platform_engagement = filtered_df.groupby('Platform')['Engagement'].mean().reset_index()
-        platform_engagement = platform_engagement.sort_values('Engagement', ascending=False)
+        platform_engagement = group_mean_frame(filtered_df, 'Platform', 'Engagement')
+        platform_engagement = attach_error_bars(platform_engagement, intervals['platform']['Engagement'], 'Platform', 'Engagement')
         
         fig_platform_engagement = px.bar(
             platform_engagement,
             x='Platform',
             y='Engagement',
+            error_y='CI Upper',
+            error_y_minus='CI Lower',
             title='Average Engagement by Platform',
             color='Platform',
             color_discrete_sequence=px.colors.qualitative.Bold
         )
-        st.plotly_chart(fig_platform_engagement, use_container_width=True)
+        st.plotly_chart(rerun_ledger.track('fig_platform_engagement', fig_platform_engagement), use_container_width=True)
         
     with col2:
         # Top video categories by engagement
-        top_categories = filtered_df.groupby('Video Category')['Engagement'].mean().reset_index()
-        top_categories = top_categories.sort_values('Engagement', ascending=False).head(5)
+        top_categories = group_mean_frame(filtered_df, 'Video Category', 'Engagement').head(5)
         
         fig_top_categories = px.bar(
             top_categories,
@@ -507,17 +864,17 @@ with tab2:
             color='Video Category',
             color_discrete_sequence=px.colors.qualitative.Bold
         )
-        st.plotly_chart(fig_top_categories, use_container_width=True)
+        st.plotly_chart(rerun_ledger.track('fig_top_categories', fig_top_categories), use_container_width=True)
     
     # Platform-category matrix
-    platform_category = pd.crosstab(filtered_df['Platform'], filtered_df['Video Category'])
+    platform_category = crosstab_frame(filtered_df, 'Platform', 'Video Category')
     fig_heatmap = px.imshow(
         platform_category,
         labels=dict(x="Video Category", y="Platform", color="Count"),
         title="Video Category Popularity by Platform",
         color_continuous_scale="Blues"
     )
-    st.plotly_chart(fig_heatmap, use_container_width=True)
+    st.plotly_chart(rerun_ledger.track('fig_heatmap', fig_heatmap), use_container_width=True)
     
     # Key insights
     st.markdown("<div class='insight-text'>", unsafe_allow_html=True)
@@ -538,22 +895,32 @@ with tab3:
     
     with col1:
         # Age vs Satisfaction by Platform
-        fig_age_sat = px.scatter(
-            filtered_df,
-            x='Age',
-            y='Satisfaction',
-            color='Platform' if selected_platform == 'All' else None,
-            size='Total Time Spent',
-            title='Age vs Satisfaction by Platform',
-            opacity=0.7
-        )
-        st.plotly_chart(fig_age_sat, use_container_width=True)
+        if rerun_ledger.degraded:
+            fig_age_sat = px.density_heatmap(
+                filtered_df,
+                x='Age',
+                y='Satisfaction',
+                title='Age vs Satisfaction (aggregated)',
+                color_continuous_scale='Viridis'
+            )
+        else:
+            fig_age_sat = px.scatter(
+                filtered_df,
+                x='Age',
+                y='Satisfaction',
+                color='Platform' if selected_platform == 'All' else None,
+                size='Total Time Spent',
+                title='Age vs Satisfaction by Platform',
+                opacity=0.7
+            )
+        st.plotly_chart(rerun_ledger.track('fig_age_sat', fig_age_sat), use_container_width=True)
         
     with col2:
         # Watch reason by gender
-        gender_reason = pd.crosstab(filtered_df['Gender'], filtered_df['Watch Reason'])
+        gender_reason = crosstab_frame(filtered_df, 'Gender', 'Watch Reason')
         gender_reason = gender_reason.reset_index()
         gender_reason_melt = pd.melt(gender_reason, id_vars=['Gender'], var_name='Watch Reason', value_name='Count')
+        rerun_ledger.track('gender_reason_melt', gender_reason_melt)
         
         fig_gender_reason = px.bar(
             gender_reason_melt,
@@ -563,10 +930,11 @@ with tab3:
             title='Watch Reasons by Gender',
             barmode='group'
         )
-        st.plotly_chart(fig_gender_reason, use_container_width=True)
+        st.plotly_chart(rerun_ledger.track('fig_gender_reason', fig_gender_reason), use_container_width=True)
     
     # Demographics vs content preferences
     demo_content = pd.crosstab([filtered_df['Age Group'], filtered_df['Gender']], filtered_df['Video Category'])
+    rerun_ledger.track('demo_content', demo_content)
     
     fig_demo_content = px.density_heatmap(
         filtered_df, 
@@ -575,7 +943,7 @@ with tab3:
         color_continuous_scale='Viridis',
         title='Content Preferences by Age Group'
     )
-    st.plotly_chart(fig_demo_content, use_container_width=True)
+    st.plotly_chart(rerun_ledger.track('fig_demo_content', fig_demo_content), use_container_width=True)
     
     # Key insights
     st.markdown("<div class='insight-text'>", unsafe_allow_html=True)
@@ -588,4 +956,20 @@ with tab3:
     - Location-based analysis reveals regional preferences that can inform localized marketing strategies.
     - Engagement metrics correlate with specific content types, suggesting where to focus creative resources.
     """)
-    st.markdown("</div>", unsafe_allow_html=True)
\ No newline at end of file
+    st.markdown("</div>", unsafe_allow_html=True)
+
+# Memory usage for this session and the worker process
+memory_registry.finish(rerun_ledger)
+memory_stats = memory_registry.snapshot()
+# Shared across sessions, so reported with the process rather than the session
+memory_stats['sort_index_mb'] = round(sort_index.nbytes / MB, 2)
+with st.sidebar.expander("🧠 Memory Usage"):
+    st.metric("This Session", f"{rerun_ledger.total_bytes / MB:.1f} MB")
+    process_rss_mb = memory_stats['process_rss_mb']
+    st.metric("Process RSS", 'n/a' if process_rss_mb is None else f"{process_rss_mb} MB", help=f"Budget: {memory_stats['budget_mb']} MB")
+    st.markdown(f"**Render Mode:** {admission['mode']}")
+    largest = sorted(rerun_ledger.items.items(), key=lambda item: item[1], reverse=True)[:5]
+    st.markdown("**Largest Allocations:**")
+    for name, size in largest:
+        st.markdown(f"- {name}: {size / 1024:.0f} KB")
+    st.json(memory_stats, expanded=False)
\ No newline at end of file
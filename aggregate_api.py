@@ -0,0 +1,313 @@
+# Social Media Analytics - Headless Aggregate API
+# DataSculpt Hackathon 2025
+#
+# Serves the dashboard's KPI means, breakdowns and crosstabs as JSON for a
+# given filter state, using the same functions as the Streamlit app.
+#
+#   python aggregate_api.py --port 8765
+#   curl "http://127.0.0.1:8765/aggregates?platform=TikTok&age_min=18&age_max=30"
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from dashboard_data import DATA_PATH, load_data, dataset_version, apply_filters, dashboard_aggregates
+
+MAX_REQUEST_LINE = 8192
+MAX_HEADERS = 100
+# Only GET and HEAD are served, so any body is drained and ignored; cap it
+MAX_BODY = 8192
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _file_stat(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+class DatasetSnapshot:
+    # One loaded version of the dataset; replaced as a whole on reload, so a
+    # request never mixes the rows of one version with the label of another
+    def __init__(self, path):
+        # Stat first: a change made while loading triggers another reload
+        self.stat = _file_stat(path)
+        self.df = load_data(path)
+        self.version = dataset_version(path)
+        self.options = {
+            'platforms': sorted(self.df['Platform'].unique().tolist()),
+            'genders': sorted(self.df['Gender'].unique().tolist()),
+            'locations': sorted(self.df['Location'].unique().tolist()),
+            'age_min': int(self.df['Age'].min()),
+            'age_max': int(self.df['Age'].max()),
+        }
+
+
+class AggregateService:
+    def __init__(self, path=DATA_PATH, cache_size=512, workers=4):
+        self.path = path
+        self.cache_size = cache_size
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='aggregates')
+        self.cache = OrderedDict()
+        self.inflight = {}
+        self.stats = {'requests': 0, 'cache_hits': 0, 'not_modified': 0, 'computed': 0, 'reloads': 0}
+        self.snapshot = DatasetSnapshot(path)
+        self._reloading = None
+        self._failed_stat = None
+
+    @property
+    def version(self):
+        return self.snapshot.version
+
+    async def _reload(self, stat):
+        loop = asyncio.get_running_loop()
+        try:
+            snapshot = await loop.run_in_executor(None, DatasetSnapshot, self.path)
+        except Exception as e:
+            # Not retried until the file changes again
+            self._failed_stat = stat
+            print(f"Reloading {self.path} failed, still serving {self.version}: {e}", flush=True)
+            return
+        finally:
+            self._reloading = None
+        self.snapshot = snapshot
+        self.stats['reloads'] += 1
+        # Keys carry the version, so old entries could never match again
+        self.cache.clear()
+
+    def refresh_if_changed(self):
+        # A cheap stat per request. A changed dataset is re-read and hashed in
+        # the background; requests keep using the current snapshot meanwhile.
+        try:
+            stat = _file_stat(self.path)
+        except OSError:
+            return
+        if stat not in (self.snapshot.stat, self._failed_stat) and self._reloading is None:
+            self._reloading = asyncio.get_running_loop().create_task(self._reload(stat))
+
+    def parse_filters(self, query, snapshot):
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+        filters = {
+            'platform': params.get('platform', 'All'),
+            'gender': params.get('gender', 'All'),
+            'location': params.get('location', 'All'),
+        }
+        for key, allowed in (('platform', 'platforms'), ('gender', 'genders'), ('location', 'locations')):
+            if filters[key] != 'All' and filters[key] not in snapshot.options[allowed]:
+                raise BadRequest(f"Unknown {key}: {filters[key]!r}")
+        try:
+            age_min = int(params.get('age_min', snapshot.options['age_min']))
+            age_max = int(params.get('age_max', snapshot.options['age_max']))
+        except ValueError:
+            raise BadRequest("age_min and age_max must be integers")
+        if age_min > age_max:
+            raise BadRequest("age_min must not exceed age_max")
+        filters['age_range'] = (age_min, age_max)
+        return filters
+
+    def etag(self, filters, snapshot):
+        key = json.dumps(filters, sort_keys=True).encode()
+        return '"%s-%s"' % (snapshot.version, hashlib.sha1(key).hexdigest()[:12])
+
+    def _compute(self, snapshot, filters):
+        filtered_df = apply_filters(snapshot.df, filters['platform'], filters['age_range'],
+                                    filters['gender'], filters['location'])
+        payload = {
+            'dataset_version': snapshot.version,
+            'filters': {**filters, 'age_range': list(filters['age_range'])},
+            'aggregates': dashboard_aggregates(filtered_df),
+        }
+        return json.dumps(payload, separators=(',', ':')).encode()
+
+    async def aggregates(self, filters, snapshot):
+        key = (snapshot.version, filters['platform'], filters['age_range'], filters['gender'], filters['location'])
+        body = self.cache.get(key)
+        if body is not None:
+            self.cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return body
+
+        # Identical requests arriving together share one computation
+        future = self.inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, self._compute, snapshot, filters)
+            self.inflight[key] = future
+            try:
+                body = await future
+            finally:
+                del self.inflight[key]
+            self.stats['computed'] += 1
+            # A reload may have finished while computing; don't cache stale versions
+            if snapshot is self.snapshot:
+                self.cache[key] = body
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            return body
+        return await asyncio.shield(future)
+
+    async def handle_request(self, method, target, headers):
+        if method not in ('GET', 'HEAD'):
+            return 405, {'Allow': 'GET, HEAD'}, _json_error("Method not allowed")
+
+        url = urlsplit(target)
+        self.refresh_if_changed()
+        # Everything this request does uses the same dataset version
+        snapshot = self.snapshot
+
+        if url.path == '/health':
+            return 200, {}, json.dumps({'status': 'ok', 'dataset_version': snapshot.version}).encode()
+        if url.path == '/filters':
+            return 200, {'ETag': '"%s"' % snapshot.version}, json.dumps(snapshot.options).encode()
+        if url.path == '/stats':
+            return 200, {}, json.dumps({**self.stats, 'cached_responses': len(self.cache)}).encode()
+        if url.path != '/aggregates':
+            return 404, {}, _json_error("Not found")
+
+        try:
+            filters = self.parse_filters(url.query, snapshot)
+        except BadRequest as e:
+            return 400, {}, _json_error(str(e))
+
+        etag = self.etag(filters, snapshot)
+        response_headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag in _parse_etags(headers.get('if-none-match', '')):
+            self.stats['not_modified'] += 1
+            return 304, response_headers, b''
+        return 200, response_headers, await self.aggregates(filters, snapshot)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, version, headers = request
+                self.stats['requests'] += 1
+                status, extra_headers, body = await self.handle_request(method, target, headers)
+
+                keep_alive = _keep_alive(version, headers)
+                writer.write(_format_response(status, extra_headers, body, keep_alive, head=method == 'HEAD'))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except BadRequest as e:
+            writer.write(_format_response(400, {}, _json_error(str(e)), keep_alive=False))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+STATUS_TEXT = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+
+def _json_error(message):
+    return json.dumps({'error': message}).encode()
+
+
+def _parse_etags(value):
+    return {tag.strip() for tag in value.split(',') if tag.strip()}
+
+
+def _keep_alive(version, headers):
+    connection = headers.get('connection', '').lower()
+    if version == 'HTTP/1.0':
+        return connection == 'keep-alive'
+    return connection != 'close'
+
+
+async def _readline(reader):
+    # StreamReader raises ValueError once a line exceeds its buffer limit
+    try:
+        return await reader.readline()
+    except ValueError:
+        raise BadRequest("Request line or header too long")
+
+
+async def _read_request(reader):
+    line = await _readline(reader)
+    if not line:
+        return None
+    if len(line) > MAX_REQUEST_LINE:
+        raise BadRequest("Request line too long")
+    parts = line.decode('latin-1').split()
+    if len(parts) != 3:
+        raise BadRequest("Malformed request line")
+    method, target, version = parts
+
+    headers = {}
+    while True:
+        line = await _readline(reader)
+        if line in (b'\r\n', b'\n', b''):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise BadRequest("Too many headers")
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    # GET requests carry no body, but drain one if a client sends it anyway
+    try:
+        length = int(headers.get('content-length', 0) or 0)
+    except ValueError:
+        raise BadRequest("Invalid Content-Length")
+    if length < 0:
+        raise BadRequest("Invalid Content-Length")
+    if length > MAX_BODY:
+        raise BadRequest("Request body too large")
+    if length:
+        await reader.readexactly(length)
+    return method, target, version, headers
+
+
+def _format_response(status, extra_headers, body, keep_alive, head=False):
+    headers = {
+        'Content-Type': 'application/json',
+        'Content-Length': str(len(body)),
+        'Connection': 'keep-alive' if keep_alive else 'close',
+        **extra_headers,
+    }
+    if status == 304:
+        del headers['Content-Length']
+        body = b''
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    head_bytes = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+    return head_bytes if head else head_bytes + body
+
+
+async def serve(host='127.0.0.1', port=8765, cache_size=512, workers=4):
+    service = AggregateService(cache_size=cache_size, workers=workers)
+    server = await asyncio.start_server(service.handle_connection, host, port, limit=MAX_REQUEST_LINE * 2)
+    addresses = ', '.join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"Serving aggregates for dataset {service.version} on {addresses}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve dashboard aggregates as JSON over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--cache-size', type=int, default=512, help="Number of filter states to keep cached")
+    parser.add_argument('--workers', type=int, default=4, help="Threads used to compute aggregates")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.cache_size, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+# Social Media Analytics - Aggregate API Benchmark
+# DataSculpt Hackathon 2025
+#
+# Starts aggregate_api.py in a subprocess (or targets a running instance with
+# --port) and measures throughput and latency with a local asyncio client.
+#
+#   python bench_aggregate_api.py --requests 2000 --concurrency 1,8,32
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode
+
+import numpy as np
+
+from dashboard_data import load_data
+
+
+def filter_states(df, limit, seed=0):
+    # Realistic filter states: mostly single selections plus a narrowed age range
+    rng = random.Random(seed)
+    platforms = ['All'] + sorted(df['Platform'].unique().tolist())
+    genders = ['All'] + sorted(df['Gender'].unique().tolist())
+    locations = ['All'] + sorted(df['Location'].unique().tolist())
+    min_age, max_age = int(df['Age'].min()), int(df['Age'].max())
+    states = []
+    for platform, gender, location in itertools.product(platforms, genders, locations):
+        low = rng.randint(min_age, max_age)
+        high = rng.randint(low, max_age)
+        states.append({'platform': platform, 'gender': gender, 'location': location,
+                       'age_min': low, 'age_max': high})
+    rng.shuffle(states)
+    return states[:limit]
+
+
+async def _request(reader, writer, path, etag=None):
+    lines = [f"GET {path} HTTP/1.1", "Host: localhost"]
+    if etag:
+        lines.append(f"If-None-Match: {etag}")
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode())
+    await writer.drain()
+
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length:
+        await reader.readexactly(length)
+    return status, headers.get('etag')
+
+
+async def _worker(host, port, paths, latencies, conditional):
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    try:
+        for path in paths:
+            start = time.perf_counter()
+            status, etag = await _request(reader, writer, path, etags.get(path) if conditional else None)
+            latencies.append(time.perf_counter() - start)
+            if status not in (200, 304):
+                raise RuntimeError(f"{path} returned HTTP {status}")
+            etags[path] = etag
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run_scenario(host, port, paths, concurrency, conditional=False):
+    # Each worker holds one keep-alive connection and walks its share of paths
+    shares = [paths[i::concurrency] for i in range(concurrency)]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker(host, port, share, latencies, conditional) for share in shares if share))
+    elapsed = time.perf_counter() - start
+    ms = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'p50': np.percentile(ms, 50),
+        'p95': np.percentile(ms, 95),
+        'p99': np.percentile(ms, 99),
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_server(host, port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Aggregate API did not start on {host}:{port}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the aggregate API with a local client.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help="Benchmark an already running server instead of starting one")
+    parser.add_argument('--requests', type=int, default=2000, help="Requests per scenario and concurrency level")
+    parser.add_argument('--concurrency', default='1,8,32', help="Comma-separated concurrency levels")
+    parser.add_argument('--states', type=int, default=200, help="Distinct filter states to cycle through")
+    args = parser.parse_args()
+
+    server = None
+    port = args.port
+    if port is None:
+        port = _free_port()
+        here = os.path.dirname(os.path.abspath(__file__))
+        server = subprocess.Popen([sys.executable, os.path.join(here, 'aggregate_api.py'),
+                                   '--host', args.host, '--port', str(port)],
+                                  stdout=subprocess.DEVNULL)
+    try:
+        _wait_for_server(args.host, port)
+        df = load_data()
+
+        requested = set()
+        print(f"{'scenario':<10} {'conc':>5} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for concurrency in [int(c) for c in args.concurrency.split(',')]:
+            # Fresh random age ranges per level; the cold pass requests each
+            # state the server has not seen yet exactly once, so every request
+            # is a compute
+            states = filter_states(df, args.states, seed=concurrency)
+            paths = list(dict.fromkeys('/aggregates?' + urlencode(state) for state in states))
+            cold = [path for path in paths if path not in requested]
+            requested.update(paths)
+            workload = [paths[i % len(paths)] for i in range(args.requests)]
+
+            for name, requests, conditional in (('cold', cold, False), ('cached', workload, False),
+                                                ('etag 304', workload, True)):
+                if not requests:
+                    continue
+                result = asyncio.run(run_scenario(args.host, port, requests, concurrency, conditional))
+                print(f"{name:<10} {concurrency:>5} {result['requests']:>9} {result['rps']:>9.0f} "
+                      f"{result['p50']:>8.2f} {result['p95']:>8.2f} {result['p99']:>8.2f}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
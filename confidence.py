@@ -0,0 +1,113 @@
+# Social Media Analytics - Confidence Intervals
+# DataSculpt Hackathon 2025
+#
+# Confidence intervals for (group) means. Small groups use a percentile
+# bootstrap where every resample of every group is drawn at once as one index
+# matrix (resamples x rows, stratified by group) and reduced per group with
+# np.add.reduceat; the same index matrix serves every metric. Large groups,
+# where the sample mean is close to normal, use the analytic normal interval.
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+N_RESAMPLES = 1000
+CONFIDENCE = 0.95
+# Groups at least this large get the analytic interval
+ANALYTIC_MIN_N = 5000
+# Upper bound on index-matrix elements per batch of resamples
+MAX_MATRIX_ELEMENTS = 4_000_000
+
+
+def _bootstrap_means(values, sizes, n_resamples, rng):
+    # values: rows sorted by group (N x metrics); sizes: rows per group, all > 0.
+    # Returns resampled means, shape (resamples x groups x metrics).
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    n_rows = int(sizes.sum())
+    # Each column of the index matrix resamples within its own group
+    col_start = np.repeat(starts, sizes)
+    col_size = np.repeat(sizes, sizes)
+
+    means = np.empty((n_resamples, len(sizes), values.shape[1]))
+    batch = max(1, MAX_MATRIX_ELEMENTS // n_rows)
+    for b0 in range(0, n_resamples, batch):
+        b = min(batch, n_resamples - b0)
+        idx = col_start + (rng.random((b, n_rows)) * col_size).astype(np.int64)
+        for m in range(values.shape[1]):
+            means[b0:b0 + b, :, m] = np.add.reduceat(values[idx, m], starts, axis=1) / sizes
+    return means
+
+
+def mean_intervals(frame, metrics, groups=None, n_resamples=N_RESAMPLES, confidence=CONFIDENCE, seed=0):
+    # Returns {metric: DataFrame indexed by group with mean, low, high, n, method}.
+    # Without `groups` the whole frame is one group labelled 'All'.
+    if groups is None:
+        codes, labels = np.zeros(len(frame), dtype=np.int64), pd.Index(['All'])
+    else:
+        codes, labels = pd.factorize(frame[groups], sort=True)
+    values = frame[metrics].to_numpy(dtype=np.float64)
+
+    valid = codes >= 0
+    order = np.argsort(codes[valid], kind='stable')
+    values = values[valid][order]
+    sizes = np.bincount(codes[valid], minlength=len(labels))
+
+    group_of_row = np.repeat(np.arange(len(labels)), sizes)
+    sums = np.stack([np.bincount(group_of_row, weights=values[:, m], minlength=len(labels))
+                     for m in range(len(metrics))], axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / sizes[:, None]
+    low = np.full_like(means, np.nan)
+    high = np.full_like(means, np.nan)
+    method = np.array(['none'] * len(labels), dtype=object)
+
+    # Analytic interval for large groups
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    large = sizes >= ANALYTIC_MIN_N
+    if large.any():
+        sq_dev = np.square(values - means[group_of_row])
+        ss = np.stack([np.bincount(group_of_row, weights=sq_dev[:, m], minlength=len(labels))
+                       for m in range(len(metrics))], axis=1)
+        half = z * np.sqrt(ss[large] / (sizes[large, None] - 1)) / np.sqrt(sizes[large, None])
+        low[large] = means[large] - half
+        high[large] = means[large] + half
+        method[large] = 'analytic'
+
+    # Bootstrap for the remaining groups with at least two rows
+    small = (sizes >= 2) & ~large
+    if small.any():
+        rows = np.isin(group_of_row, np.flatnonzero(small))
+        rng = np.random.default_rng(seed)
+        boot = _bootstrap_means(values[rows], sizes[small], n_resamples, rng)
+        alpha = (1 - confidence) / 2
+        low[small], high[small] = np.quantile(boot, [alpha, 1 - alpha], axis=0)
+        method[small] = 'bootstrap'
+
+    results = {}
+    for m, metric in enumerate(metrics):
+        results[metric] = pd.DataFrame({
+            'mean': means[:, m],
+            'low': low[:, m],
+            'high': high[:, m],
+            'n': sizes,
+            'method': method,
+        }, index=pd.Index(labels, name=groups))
+    return results
+
+
+def attach_error_bars(frame, intervals, by, metric):
+    # Adds the distances from each group mean to its interval bounds, in the
+    # form plotly's error_y / error_y_minus expect
+    ci = intervals[['low', 'high']].rename_axis(by).reset_index()
+    frame = frame.merge(ci, on=by, how='left')
+    frame['CI Upper'] = frame['high'] - frame[metric]
+    frame['CI Lower'] = frame[metric] - frame['low']
+    return frame.drop(columns=['low', 'high'])
+
+
+def format_interval(intervals, confidence=CONFIDENCE):
+    row = intervals.iloc[0]
+    if np.isnan(row['low']):
+        return f"{confidence:.0%} CI: n/a"
+    return f"{confidence:.0%} CI: {row['low']:.2f} – {row['high']:.2f}"
@@ -0,0 +1,200 @@
+# Social Media Analytics - Contingency Tensor
+# DataSculpt Hackathon 2025
+#
+# Sparse contingency tensors for the pivot explorer. One pass over the rows
+# builds a base cell table: every occupied combination of all categorical
+# columns with its user count and per-metric sums (mixed-radix int64 keys,
+# np.unique and np.bincount); no row-level arrays are kept. The tensor for a
+# combination of pivot dimensions, keyed on those dimensions plus the sidebar
+# filter dimensions, is derived from the base cells rather than the rows and
+# cached. Its size is bounded by the product of its dimensions' cardinalities,
+# and every pivot of that combination, under any filter state, is answered
+# from its cells.
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+PIVOT_DIMENSIONS = ['Platform', 'Gender', 'Location', 'Age Group', 'Profession', 'Demographics',
+                    'Video Category', 'Frequency', 'Watch Reason', 'DeviceType', 'OS', 'Watch Time',
+                    'CurrentActivity', 'ConnectionType']
+PIVOT_METRICS = ['Total Time Spent', 'Number of Sessions', 'Engagement', 'Time Spent On Video',
+                 'Scroll Rate', 'ProductivityLoss', 'Satisfaction', 'Self Control', 'Addiction Level']
+
+# Filter dimensions are always encoded so the sidebar filters can slice cells
+FILTER_DIMENSIONS = ['Platform', 'Gender', 'Location', 'Age']
+# The dashboard's default pivot is derived up front; others on first use
+DEFAULT_PIVOTS = [('Platform', 'Video Category')]
+# Derived tensors are evicted, least recently used first, above this many cells
+MAX_CACHED_CELLS = 2_000_000
+
+
+def _encode(column):
+    # Integer codes and labels; categoricals keep their declared order
+    categorical = column if isinstance(column.dtype, pd.CategoricalDtype) else column.astype('category')
+    codes = categorical.cat.codes.to_numpy().astype(np.int64)
+    categories = list(categorical.cat.categories)
+    if (codes < 0).any():
+        codes[codes < 0] = len(categories)
+        categories.append('Missing')
+    return codes, categories
+
+
+def _combine_codes(codes, radices):
+    # Mixed-radix combination of several code arrays into one int64 key
+    combined = np.zeros(len(codes[0]), dtype=np.int64)
+    for c, radix in zip(codes, radices):
+        combined = combined * radix + c
+    return combined
+
+
+def _occupied_cells(codes, radices):
+    # Distinct combinations of the code arrays: (inverse per input position,
+    # code of each cell per array in the smallest int type)
+    if np.prod([float(r) for r in radices]) < 2 ** 63:
+        keys, inverse = np.unique(_combine_codes([c.astype(np.int64) for c in codes], radices),
+                                  return_inverse=True)
+        cell_codes = []
+        for radix in reversed(radices):
+            cell_codes.append(keys % radix)
+            keys = keys // radix
+        cell_codes.reverse()
+    else:
+        # Too many combinations for one int64 key; unique rows of the codes
+        rows, inverse = np.unique(np.stack(codes, axis=1), axis=0, return_inverse=True)
+        cell_codes = list(rows.T)
+    cell_codes = [c.astype(np.min_scalar_type(radix)) for c, radix in zip(cell_codes, radices)]
+    return inverse.ravel(), cell_codes
+
+
+class _Cells:
+    # Occupied cells of one tensor: counts, per-metric sums and the code of
+    # each cell along every dimension of the tensor
+    def __init__(self, counts, sums, cell_codes):
+        self.counts = counts
+        self.sums = sums
+        self.cell_codes = cell_codes
+
+
+class ContingencyTensor:
+    def __init__(self, df, dimensions=PIVOT_DIMENSIONS, metrics=PIVOT_METRICS,
+                 precompute=DEFAULT_PIVOTS, max_cached_cells=MAX_CACHED_CELLS):
+        self.dimensions = list(dict.fromkeys(list(dimensions) + FILTER_DIMENSIONS))
+        self.metrics = list(metrics)
+        self.n_rows = len(df)
+        self.max_cached_cells = max_cached_cells
+
+        self.categories = {}
+        codes = []
+        for dim in self.dimensions:
+            dim_codes, categories = _encode(df[dim])
+            self.categories[dim] = categories
+            codes.append(dim_codes.astype(np.min_scalar_type(len(categories))))
+        self.radices = {dim: len(self.categories[dim]) for dim in self.dimensions}
+
+        # The only pass over the rows: base cells over every dimension, with
+        # sums weighted straight from the metric columns
+        inverse, cell_codes = _occupied_cells(codes, [self.radices[dim] for dim in self.dimensions])
+        del codes
+        n_cells = len(cell_codes[0])
+        self.base = _Cells(
+            np.bincount(inverse, minlength=n_cells),
+            {m: np.bincount(inverse, weights=df[m], minlength=n_cells) for m in self.metrics},
+            dict(zip(self.dimensions, cell_codes)),
+        )
+
+        self._tensors = OrderedDict()
+        self._cached_cells = 0
+        self._lock = threading.Lock()
+        for dims in precompute:
+            self.cells(dims)
+
+    def _key_dimensions(self, dims):
+        # Filter dimensions plus `dims`, in a fixed order so that any ordering
+        # of the same pivot dimensions shares one tensor
+        wanted = set(dims) | set(FILTER_DIMENSIONS)
+        return tuple(dim for dim in self.dimensions if dim in wanted)
+
+    def _derive(self, key_dims):
+        # Roll the base cells up onto `key_dims`
+        base = self.base
+        inverse, cell_codes = _occupied_cells([base.cell_codes[dim] for dim in key_dims],
+                                              [self.radices[dim] for dim in key_dims])
+        n_cells = len(cell_codes[0])
+        return _Cells(
+            np.bincount(inverse, weights=base.counts, minlength=n_cells).astype(np.int64),
+            {m: np.bincount(inverse, weights=base.sums[m], minlength=n_cells) for m in self.metrics},
+            dict(zip(key_dims, cell_codes)),
+        )
+
+    def cells(self, dims):
+        key_dims = self._key_dimensions(dims)
+        if key_dims == tuple(self.dimensions):
+            return self.base
+        with self._lock:
+            cells = self._tensors.get(key_dims)
+            if cells is not None:
+                self._tensors.move_to_end(key_dims)
+                return cells
+        cells = self._derive(key_dims)
+        with self._lock:
+            if key_dims not in self._tensors:
+                self._tensors[key_dims] = cells
+                self._cached_cells += len(cells.counts)
+            while self._cached_cells > self.max_cached_cells and len(self._tensors) > 1:
+                _, evicted = self._tensors.popitem(last=False)
+                self._cached_cells -= len(evicted.counts)
+        return cells
+
+    def stats(self):
+        # Cells per row of the base table and of each cached tensor
+        with self._lock:
+            tensors = dict(self._tensors)
+        ratio = lambda cells: round(len(cells.counts) / max(self.n_rows, 1), 3)
+        return {
+            'rows': self.n_rows,
+            'base_cells_per_row': ratio(self.base),
+            'cells_per_row': {', '.join(dims): ratio(cells) for dims, cells in tensors.items()},
+        }
+
+    def cell_mask(self, cells, platform='All', age_range=None, gender='All', location='All'):
+        n_cells = len(cells.counts)
+        mask = np.ones(n_cells, dtype=bool)
+        for dim, value in (('Platform', platform), ('Gender', gender), ('Location', location)):
+            if value != 'All':
+                categories = self.categories[dim]
+                if value not in categories:
+                    return np.zeros(n_cells, dtype=bool)
+                mask &= cells.cell_codes[dim] == categories.index(value)
+        if age_range is not None:
+            ages = np.asarray(self.categories['Age'])
+            allowed = (ages >= age_range[0]) & (ages <= age_range[1])
+            mask &= allowed[cells.cell_codes['Age']]
+        return mask
+
+    def pivot(self, dimensions, metric=None, platform='All', age_range=None, gender='All', location='All'):
+        # Long frame with one row per occupied combination of `dimensions`:
+        # Users, plus Total and Average of `metric` when given
+        cells = self.cells(dimensions)
+        mask = self.cell_mask(cells, platform, age_range, gender, location)
+        radices = [self.radices[dim] for dim in dimensions]
+        size = int(np.prod(radices))
+        sub_keys = _combine_codes([cells.cell_codes[dim][mask].astype(np.int64) for dim in dimensions], radices)
+
+        users = np.bincount(sub_keys, weights=cells.counts[mask], minlength=size)
+        occupied = np.flatnonzero(users)
+        result = {}
+        remainder = occupied
+        for dim, radix in reversed(list(zip(dimensions, radices))):
+            labels = np.asarray(self.categories[dim], dtype=object)
+            result[dim] = labels[remainder % radix]
+            remainder = remainder // radix
+        frame = pd.DataFrame({dim: result[dim] for dim in dimensions})
+        frame['Users'] = users[occupied].astype(np.int64)
+        if metric is not None:
+            totals = np.bincount(sub_keys, weights=cells.sums[metric][mask], minlength=size)[occupied]
+            frame['Total'] = totals
+            frame['Average'] = totals / frame['Users']
+        return frame
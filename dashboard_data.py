@@ -0,0 +1,187 @@
+# Social Media Analytics - Shared Data Layer
+# DataSculpt Hackathon 2025
+#
+# Loading, filtering and aggregation used by the Streamlit dashboard and the
+# headless aggregate API, so both report exactly the same numbers.
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Time-Wasters on Social Media.csv')
+
+AGE_BINS = [0, 18, 25, 35, 45, 55, 65, 100]
+AGE_LABELS = ['Under 18', '18-24', '25-34', '35-44', '45-54', '55-64', '65+']
+
+# Breakdowns shown on the dashboard: (column, metric) pairs for group means
+# and the crosstabs rendered in the stakeholder tabs
+COUNT_COLUMNS = ['Platform', 'Gender', 'Location', 'Profession', 'DeviceType', 'OS',
+                 'Video Category', 'Watch Reason', 'Watch Time', 'ConnectionType']
+MEAN_BREAKDOWNS = [
+    ('Platform', 'Total Time Spent'),
+    ('Platform', 'ProductivityLoss'),
+    ('Platform', 'Engagement'),
+    ('Video Category', 'Engagement'),
+]
+CROSSTABS = [
+    ('Platform', 'DeviceType'),
+    ('Platform', 'Video Category'),
+    ('Gender', 'Watch Reason'),
+]
+
+
+def load_data(path=DATA_PATH):
+    df = pd.read_csv(path)
+    # Basic cleaning
+    df['Debt'] = df['Debt'].astype(bool)
+    df['Owns Property'] = df['Owns Property'].astype(bool)
+
+    # Create Age Group column
+    df['Age Group'] = pd.cut(df['Age'], bins=AGE_BINS, labels=AGE_LABELS, right=False)
+
+    return df
+
+
+def dataset_version(path=DATA_PATH):
+    # Content hash of the CSV, used to key caches and ETags
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def filter_mask(df, platform='All', age_range=None, gender='All', location='All'):
+    mask = np.ones(len(df), dtype=bool)
+    if platform != 'All':
+        mask &= (df['Platform'] == platform).to_numpy()
+    if age_range is not None:
+        age = df['Age'].to_numpy()
+        mask &= (age >= age_range[0]) & (age <= age_range[1])
+    if gender != 'All':
+        mask &= (df['Gender'] == gender).to_numpy()
+    if location != 'All':
+        mask &= (df['Location'] == location).to_numpy()
+    return mask
+
+
+def apply_filters(df, platform='All', age_range=None, gender='All', location='All'):
+    return df[filter_mask(df, platform, age_range, gender, location)]
+
+
+def kpi_summary(filtered_df):
+    return {
+        'total_users': int(filtered_df.shape[0]),
+        'avg_time': round(filtered_df['Total Time Spent'].mean(), 2),
+        'avg_satisfaction': round(filtered_df['Satisfaction'].mean(), 2),
+        'avg_addiction': round(filtered_df['Addiction Level'].mean(), 2),
+    }
+
+
+def value_counts_frame(filtered_df, column):
+    counts = filtered_df[column].value_counts().reset_index()
+    counts.columns = [column, 'Count']
+    return counts
+
+
+def group_mean_frame(filtered_df, by, metric):
+    means = filtered_df.groupby(by)[metric].mean().reset_index()
+    return means.sort_values(metric, ascending=False)
+
+
+def crosstab_frame(filtered_df, rows, cols):
+    return pd.crosstab(filtered_df[rows], filtered_df[cols])
+
+
+def _json_number(value):
+    # NaN (e.g. the mean of an empty selection) is not valid JSON
+    if isinstance(value, (float, np.floating)) and np.isnan(value):
+        return None
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    return value
+
+
+def dashboard_aggregates(filtered_df):
+    # Everything the dashboard's KPI cards, bar charts and crosstabs show,
+    # in a JSON-serializable form
+    kpis = {key: _json_number(value) for key, value in kpi_summary(filtered_df).items()}
+
+    counts = {}
+    for column in COUNT_COLUMNS:
+        frame = value_counts_frame(filtered_df, column)
+        counts[column] = {str(k): int(v) for k, v in zip(frame[column], frame['Count'])}
+
+    means = {}
+    for by, metric in MEAN_BREAKDOWNS:
+        frame = group_mean_frame(filtered_df, by, metric)
+        means[f'{metric} by {by}'] = {str(k): _json_number(round(v, 4)) for k, v in zip(frame[by], frame[metric])}
+
+    crosstabs = {}
+    for rows, cols in CROSSTABS:
+        table = crosstab_frame(filtered_df, rows, cols)
+        crosstabs[f'{rows} x {cols}'] = {
+            str(r): {str(c): int(v) for c, v in table.loc[r].items()} for r in table.index
+        }
+
+    return {'kpis': kpis, 'counts': counts, 'means': means, 'crosstabs': crosstabs}
+
+
+# Cohort comparison: a cohort is a filter state, e.g.
+# {'platform': 'TikTok', 'age_range': (18, 30), 'gender': 'All', 'location': 'India'}
+COHORT_KPIS = {
+    'Users': ('UserID', 'size'),
+    'Avg. Time Spent': ('Total Time Spent', 'mean'),
+    'Avg. Satisfaction': ('Satisfaction', 'mean'),
+    'Avg. Addiction Level': ('Addiction Level', 'mean'),
+}
+COHORT_SCORES = ['Satisfaction', 'Addiction Level', 'ProductivityLoss', 'Self Control']
+COHORT_BREAKDOWNS = ['Platform', 'Video Category', 'Watch Reason', 'DeviceType', 'Age Group', 'Location']
+
+
+def cohort_name(cohort):
+    parts = [cohort[key] for key in ('platform', 'gender', 'location') if cohort.get(key, 'All') != 'All']
+    if cohort.get('age_range') is not None:
+        parts.append(f"{cohort['age_range'][0]}-{cohort['age_range'][1]}")
+    return ' · '.join(parts) if parts else 'All users'
+
+
+def label_cohorts(df, cohorts):
+    # Membership matrix (rows x cohorts); cohorts may overlap, so a row gets one
+    # (row, cohort id) pair per cohort it belongs to
+    masks = np.column_stack([
+        filter_mask(df, c.get('platform', 'All'), c.get('age_range'), c.get('gender', 'All'), c.get('location', 'All'))
+        for c in cohorts
+    ])
+    rows, cohort_ids = np.nonzero(masks)
+    return rows, cohort_ids
+
+
+def cohort_aggregates(df, cohorts, breakdowns=COHORT_BREAKDOWNS, scores=COHORT_SCORES):
+    names = [cohort_name(c) for c in cohorts]
+    # Disambiguate cohorts that describe the same filter state
+    names = [f"{i + 1}. {name}" for i, name in enumerate(names)]
+
+    columns = sorted({col for col, _ in COHORT_KPIS.values()} | set(breakdowns) | set(scores))
+    rows, cohort_ids = label_cohorts(df, cohorts)
+    labeled = df[columns].iloc[rows].reset_index(drop=True)
+    labeled['Cohort'] = pd.Categorical.from_codes(cohort_ids, categories=names)
+    grouped = labeled.groupby('Cohort', observed=False)
+
+    kpis = grouped.agg(**COHORT_KPIS)
+    kpis['Users'] = kpis['Users'].fillna(0).astype(int)
+
+    means = grouped[scores].mean().reset_index().melt(id_vars='Cohort', var_name='Metric', value_name='Average')
+
+    shares = {}
+    for column in breakdowns:
+        counts = labeled.groupby(['Cohort', column], observed=True).size().rename('Count').reset_index()
+        totals = counts['Cohort'].map(kpis['Users']).astype(float)
+        counts['Share'] = counts['Count'] / totals * 100
+        shares[column] = counts
+
+    return {'names': names, 'kpis': kpis, 'means': means, 'shares': shares}
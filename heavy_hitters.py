@@ -0,0 +1,137 @@
+# Social Media Analytics - Heavy Hitters
+# DataSculpt Hackathon 2025
+#
+# Top-K tracking for high-cardinality columns (Video ID, Profession, Location).
+#
+# The data is split into filter cells, one per distinct combination of the
+# sidebar filter dimensions. Each cell keeps a bounded Space-Saving style
+# summary: up to `capacity` items with an overestimated `count` and an `error`
+# so that count - error <= true weight <= count, plus a `floor` that bounds
+# the weight of any item the cell does not track. Summaries are mergeable:
+# they are built chunk by chunk (exact counts within a chunk, then folded into
+# the running summary), so building never holds more than one chunk's distinct
+# (cell, item) pairs, and the top items for a filter state come from merging
+# the matching cells' summaries instead of re-counting rows.
+
+import numpy as np
+import pandas as pd
+
+from dashboard_data import filter_mask
+
+FILTER_DIMENSIONS = ['Platform', 'Gender', 'Location', 'Age']
+DEFAULT_CAPACITY = 64
+BUILD_CHUNK = 100_000
+
+# name -> (item column, weight column or None to count rows)
+TRACKED = {
+    'video_views': ('Video ID', None),
+    'video_engagement': ('Video ID', 'Engagement'),
+    'profession': ('Profession', None),
+    'location': ('Location', None),
+}
+
+
+class Summary:
+    def __init__(self, entries, floors):
+        # entries: DataFrame with columns cell, item, count, error
+        # floors: upper bound on the weight of untracked items, per cell
+        self.entries = entries
+        self.floors = floors
+
+
+def _combine(entries, part_floors, group_cols, group_floors):
+    # Sum counts and errors per group. An item that some part did not track may
+    # still weigh up to that part's floor, so the floors of the parts missing
+    # the item are added to both its estimate and its error.
+    grouped = entries.assign(floor=part_floors).groupby(group_cols, sort=False)
+    merged = grouped.agg(count=('count', 'sum'), error=('error', 'sum'), floor=('floor', 'sum')).reset_index()
+    missing = group_floors(merged) - merged.pop('floor').to_numpy()
+    merged['count'] += missing
+    merged['error'] += missing
+    return merged
+
+
+def _truncate(merged, capacity, floors):
+    # Keep the `capacity` heaviest items per cell; the largest dropped count
+    # becomes part of that cell's floor
+    merged = merged.sort_values(['cell', 'count'], ascending=[True, False], kind='stable')
+    rank = merged.groupby('cell', sort=False).cumcount().to_numpy()
+    dropped = merged[rank == capacity]
+    floors = floors.copy()
+    dropped_cells = dropped['cell'].to_numpy()
+    floors[dropped_cells] = np.maximum(floors[dropped_cells], dropped['count'].to_numpy())
+    return Summary(merged[rank < capacity].reset_index(drop=True), floors)
+
+
+def _chunk_summary(cell_ids, n_cells, items, weights, capacity):
+    # Exact per-cell totals for one chunk, truncated to `capacity`
+    frame = pd.DataFrame({'cell': cell_ids, 'item': items, 'count': weights})
+    totals = frame.groupby(['cell', 'item'], sort=False)['count'].sum().reset_index()
+    totals['error'] = totals['count'] * 0
+    return _truncate(totals, capacity, np.zeros(n_cells, dtype=totals['count'].dtype))
+
+
+def build_summary(cell_ids, n_cells, items, weights=None, capacity=DEFAULT_CAPACITY, chunk_size=BUILD_CHUNK):
+    if weights is None:
+        weights = np.ones(len(items), dtype=np.int64)
+    summary = None
+    for start in range(0, max(len(items), 1), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        part = _chunk_summary(cell_ids[chunk], n_cells, items[chunk], weights[chunk], capacity)
+        summary = part if summary is None else merge_summaries(summary, part, capacity)
+    return summary
+
+
+def merge_summaries(a, b, capacity=DEFAULT_CAPACITY):
+    # Merge two summaries over the same cells, e.g. built from consecutive chunks
+    entries = pd.concat([a.entries, b.entries], ignore_index=True)
+    part_floors = np.concatenate([a.floors[a.entries['cell'].to_numpy()], b.floors[b.entries['cell'].to_numpy()]])
+    cell_floors = a.floors + b.floors
+    merged = _combine(entries, part_floors, ['cell', 'item'], lambda m: cell_floors[m['cell'].to_numpy()])
+    return _truncate(merged, capacity, cell_floors)
+
+
+def top_k(summary, cell_selection, k=10):
+    # Merge the summaries of the selected cells and report the k heaviest items.
+    # `lower` is a guaranteed lower bound; `guaranteed` marks items whose lower
+    # bound beats every other item's estimate, i.e. they are certainly top-k.
+    selected = cell_selection[summary.entries['cell'].to_numpy()]
+    entries = summary.entries[selected]
+    total_floor = summary.floors[cell_selection].sum()
+    if entries.empty:
+        return pd.DataFrame(columns=['item', 'count', 'error', 'lower', 'guaranteed']), total_floor
+
+    part_floors = summary.floors[entries['cell'].to_numpy()]
+    merged = _combine(entries[['item', 'count', 'error']], part_floors, ['item'], lambda m: total_floor)
+    merged = merged.sort_values('count', ascending=False, kind='stable').reset_index(drop=True)
+
+    top = merged.head(k).copy()
+    top['lower'] = top['count'] - top['error']
+    # Anything outside the top k weighs at most the next estimate (or the
+    # floor for items no selected cell tracks)
+    threshold = max(merged['count'].iloc[k] if len(merged) > k else 0, total_floor)
+    top['guaranteed'] = top['lower'] >= threshold
+    return top, total_floor
+
+
+class HeavyHitterIndex:
+    def __init__(self, df, capacity=DEFAULT_CAPACITY, tracked=TRACKED):
+        # One cell per distinct combination of filter dimensions; missing values
+        # form their own cells (by default they would get cell id -1)
+        grouped = df.groupby(FILTER_DIMENSIONS, sort=False, observed=True, dropna=False)
+        codes = grouped.ngroup().to_numpy()
+        self.cells = grouped.size().reset_index()[FILTER_DIMENSIONS]
+        self.capacity = capacity
+        self.summaries = {}
+        for name, (column, weight) in tracked.items():
+            weights = None if weight is None else df[weight].to_numpy()
+            self.summaries[name] = build_summary(codes, len(self.cells), df[column].to_numpy(), weights, capacity)
+
+    def cell_selection(self, platform='All', age_range=None, gender='All', location='All'):
+        # Cells carry the filter columns, so the dashboard's filter applies directly
+        return filter_mask(self.cells, platform, age_range, gender, location)
+
+    def top_k(self, name, k=10, platform='All', age_range=None, gender='All', location='All'):
+        selection = self.cell_selection(platform, age_range, gender, location)
+        top, _ = top_k(self.summaries[name], selection, k)
+        return top
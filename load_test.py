@@ -0,0 +1,270 @@
+# Social Media Analytics - Dashboard Load Test
+# DataSculpt Hackathon 2025
+#
+# Drives "Hackathon Streamlit.py" with many simulated sessions over Streamlit's
+# websocket protocol, the same way browsers talk to a worker. The script starts
+# a local `streamlit run` server (or targets one with --port), and each session
+# loads the dashboard and then performs realistic filter changes: selectbox
+# switches, age-slider adjustments and cohort-comparison toggles. For each
+# concurrency level the report shows rerun latency percentiles, throughput and
+# the server's peak RSS.
+#
+# The client speaks Streamlit's internal BackMsg/ForwardMsg protocol, which is
+# not a stable API. It was written against Streamlit 1.66 and needs a release
+# that sends selectbox state as `string_value` (older ones send an index).
+#
+#   python load_test.py --levels 1,2,4,8 --actions 10
+#   python load_test.py --levels 4 --fail-p95-ms 3000   # exit 1 on regression
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from dashboard_data import load_data
+from memory_budget import process_rss, MB
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Hackathon Streamlit.py')
+
+# Relative frequency of each simulated user action
+ACTION_WEIGHTS = {
+    'platform': 3,
+    'age_drag': 3,
+    'gender': 2,
+    'location': 2,
+    'compare': 1,
+}
+SELECTBOX_LABELS = {'platform': 'Select Platform', 'gender': 'Select Gender', 'location': 'Select Location'}
+WIDGET_TYPES = ('selectbox', 'slider', 'checkbox')
+
+# ScriptFinishedStatus values that mean the run completed
+FINISHED_OK = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)
+
+
+class DashboardSession:
+    # One simulated browser tab: keeps the widget ids seen in the last run and
+    # sends every changed widget's state with each rerun, like the frontend
+    def __init__(self, url, timeout):
+        self.url = url
+        self.timeout = timeout
+        self.widgets = {}
+        self.widget_states = {}
+        self.ws = None
+
+    async def __aenter__(self):
+        self.ws = await websockets.connect(self.url, subprotocols=['streamlit'], max_size=None)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.ws.close()
+
+    async def rerun(self):
+        msg = BackMsg()
+        msg.rerun_script.query_string = ''
+        msg.rerun_script.widget_states.SetInParent()
+        for state in self.widget_states.values():
+            msg.rerun_script.widget_states.widgets.append(state)
+
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        widgets = {}
+        error = None
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await asyncio.wait_for(self.ws.recv(), self.timeout))
+            kind = forward.WhichOneof('type')
+            if kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+                element = forward.delta.new_element
+                element_type = element.WhichOneof('type')
+                if element_type in WIDGET_TYPES:
+                    widget = getattr(element, element_type)
+                    # Sidebar filters render before any widget sharing their label
+                    widgets.setdefault(widget.label, widget)
+                elif element_type == 'exception' and error is None:
+                    error = f"{element.exception.type}: {element.exception.message}"
+            elif kind == 'script_finished':
+                if forward.script_finished in FINISHED_OK:
+                    break
+                if forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    error = error or f"script finished with status {forward.script_finished}"
+                    break
+        elapsed = time.perf_counter() - start
+        if error:
+            raise RuntimeError(f"Dashboard raised {error}")
+        self.widgets = widgets
+        return elapsed
+
+    def set_widget(self, label, **value):
+        state = self.widget_states.get(label)
+        if state is None:
+            state = BackMsg().rerun_script.widget_states.widgets.add()
+            state.id = self.widgets[label].id
+            self.widget_states[label] = state
+        for field, v in value.items():
+            if field == 'double_array_value':
+                state.double_array_value.data[:] = v
+            else:
+                setattr(state, field, v)
+
+
+async def simulate_session(url, session_no, options, n_actions, seed, think_s, timeout):
+    rng = random.Random(seed * 1000 + session_no)
+    initial, reruns = [], []
+    async with DashboardSession(url, timeout) as session:
+        initial.append(await session.rerun())
+        age_range = (options['age_min'], options['age_max'])
+        compare = False
+
+        actions = list(ACTION_WEIGHTS)
+        weights = list(ACTION_WEIGHTS.values())
+        for _ in range(n_actions):
+            await asyncio.sleep(think_s * rng.uniform(0.5, 1.5))
+            action = rng.choices(actions, weights)[0]
+            if action == 'age_drag':
+                # Adjusting the slider usually takes a few moves, each a rerun
+                low, high = age_range
+                target_low = rng.randint(options['age_min'], options['age_max'] - 1)
+                target_high = rng.randint(target_low + 1, options['age_max'])
+                for step in (1, 2, 3):
+                    age_range = (low + (target_low - low) * step // 3, high + (target_high - high) * step // 3)
+                    session.set_widget('Age Range', double_array_value=age_range)
+                    reruns.append(await session.rerun())
+            elif action == 'compare':
+                compare = not compare
+                session.set_widget('Enable comparison mode', bool_value=compare)
+                reruns.append(await session.rerun())
+            else:
+                session.set_widget(SELECTBOX_LABELS[action], string_value=rng.choice(options[action]))
+                reruns.append(await session.rerun())
+    return initial, reruns
+
+
+async def _sample_rss(pid, state, interval=0.05):
+    while True:
+        rss = process_rss(pid)
+        if rss is not None:
+            state['peak'] = max(state['peak'], rss)
+        await asyncio.sleep(interval)
+
+
+async def run_level(url, pid, concurrency, options, n_actions, seed, think_s, timeout):
+    rss = {'peak': 0}
+    sampler = asyncio.create_task(_sample_rss(pid, rss)) if pid else None
+    start = time.perf_counter()
+    try:
+        sessions = await asyncio.gather(*(
+            simulate_session(url, i, options, n_actions, seed, think_s, timeout) for i in range(concurrency)
+        ))
+    finally:
+        if sampler:
+            sampler.cancel()
+    elapsed = time.perf_counter() - start
+
+    initial = [t for session_initial, _ in sessions for t in session_initial]
+    reruns = [t for _, session_reruns in sessions for t in session_reruns]
+    ms = np.array(reruns) * 1000
+    return {
+        'concurrency': concurrency,
+        'reruns': len(reruns) + len(initial),
+        'throughput_rps': round((len(reruns) + len(initial)) / elapsed, 2),
+        'initial_load_p50_ms': round(float(np.percentile(np.array(initial) * 1000, 50)), 1),
+        'p50_ms': round(float(np.percentile(ms, 50)), 1),
+        'p95_ms': round(float(np.percentile(ms, 95)), 1),
+        'p99_ms': round(float(np.percentile(ms, 99)), 1),
+        'peak_rss_mb': round(rss['peak'] / MB, 1) if rss['peak'] else None,
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_server(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Streamlit server did not start on port {port}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the dashboard with concurrent simulated sessions.")
+    parser.add_argument('--levels', default='1,2,4,8', help="Comma-separated concurrency levels")
+    parser.add_argument('--actions', type=int, default=10, help="Filter changes per session")
+    parser.add_argument('--think-ms', type=float, default=250, help="Average pause between user actions")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=120, help="Seconds allowed per rerun")
+    parser.add_argument('--port', type=int, help="Load test an already running server instead of starting one")
+    parser.add_argument('--server-pid', type=int, help="PID of the --port server, to report its peak RSS")
+    parser.add_argument('--json', help="Also write the results to this file")
+    parser.add_argument('--fail-p95-ms', type=float, help="Exit with status 1 if any level's p95 exceeds this")
+    args = parser.parse_args()
+
+    df = load_data()
+    options = {
+        'platform': ['All'] + sorted(df['Platform'].unique().tolist()),
+        'gender': ['All'] + sorted(df['Gender'].unique().tolist()),
+        'location': ['All'] + sorted(df['Location'].unique().tolist()),
+        'age_min': int(df['Age'].min()),
+        'age_max': int(df['Age'].max()),
+    }
+
+    server = None
+    port, pid = args.port, args.server_pid
+    if port is None:
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'streamlit', 'run', APP_PATH,
+             '--server.headless', 'true', '--server.port', str(port),
+             '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        pid = server.pid
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+
+    try:
+        _wait_for_server(port)
+        # Warm the server's caches so the first level is not charged for them
+        asyncio.run(simulate_session(url, -1, options, 0, args.seed, 0, args.timeout))
+
+        results = []
+        print(f"{'conc':>5} {'reruns':>7} {'reruns/s':>9} {'load p50':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'peak RSS':>9}")
+        for concurrency in [int(level) for level in args.levels.split(',')]:
+            result = asyncio.run(run_level(url, pid, concurrency, options, args.actions, args.seed,
+                                           args.think_ms / 1000, args.timeout))
+            results.append(result)
+            peak = f"{result['peak_rss_mb']} MB" if result['peak_rss_mb'] is not None else 'n/a'
+            print(f"{result['concurrency']:>5} {result['reruns']:>7} {result['throughput_rps']:>9} "
+                  f"{result['initial_load_p50_ms']:>9} {result['p50_ms']:>8} {result['p95_ms']:>8} "
+                  f"{result['p99_ms']:>8} {peak:>9}", flush=True)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.fail_p95_ms is not None and any(r['p95_ms'] > args.fail_p95_ms for r in results):
+        print(f"FAIL: p95 rerun latency above {args.fail_p95_ms} ms")
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
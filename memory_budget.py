@@ -0,0 +1,237 @@
+# Social Media Analytics - Memory Accounting and Admission Control
+# DataSculpt Hackathon 2025
+#
+# Tracks the approximate memory each session's rerun allocates (filtered
+# frames, crosstabs, figures) and the process RSS. When the process nears its
+# budget, heavy reruns are queued and then degraded (e.g. scatter plots are
+# drawn as aggregated heatmaps) instead of letting the worker run out of memory.
+# A session's budget is checked against the current rerun: its filtered frame
+# is measured before admission and scaled by how much the session's previous
+# rerun allocated per byte of filtered frame.
+#
+# Limits are configured with environment variables:
+#   DASHBOARD_MEMORY_BUDGET_MB     process budget (default 1024)
+#   DASHBOARD_MEMORY_SOFT_FRACTION fraction of the budget where queueing starts (default 0.8)
+#   DASHBOARD_SESSION_BUDGET_MB    per-session budget (default 256)
+#   DASHBOARD_MAX_HEAVY_RERUNS     heavy reruns allowed at once under pressure (default 2)
+#   DASHBOARD_QUEUE_TIMEOUT_S      how long a rerun waits for a slot before degrading (default 5)
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+MB = 1024 * 1024
+
+BUDGET_BYTES = float(os.environ.get('DASHBOARD_MEMORY_BUDGET_MB', 1024)) * MB
+SOFT_FRACTION = float(os.environ.get('DASHBOARD_MEMORY_SOFT_FRACTION', 0.8))
+SESSION_BUDGET_BYTES = float(os.environ.get('DASHBOARD_SESSION_BUDGET_MB', 256)) * MB
+MAX_HEAVY_RERUNS = int(os.environ.get('DASHBOARD_MAX_HEAVY_RERUNS', 2))
+QUEUE_TIMEOUT_S = float(os.environ.get('DASHBOARD_QUEUE_TIMEOUT_S', 5))
+
+# Sessions that have not rerun for this long are dropped from the registry,
+# and heavy slots held this long (e.g. by an interrupted rerun) are reclaimed
+SESSION_TTL_S = 30 * 60
+SLOT_TTL_S = 60
+
+
+def process_rss(pid=None):
+    # Current resident set size from /proc (Linux), or None where it is not
+    # available; callers treat an unknown RSS as no process pressure
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss():
+    # Peak resident set size of this process, for display only: a single
+    # spike would otherwise keep admission degraded for good
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+# Object arrays and long lists are sized from a sample of their elements
+SIZE_SAMPLE = 1000
+
+
+def _sampled_bytes(items, n):
+    # Pointer per element plus the average payload of the first elements
+    if n == 0:
+        return 0
+    sample = [_payload_bytes(v) for v in items[:SIZE_SAMPLE]]
+    return 8 * n + int(sum(sample) / len(sample) * n)
+
+
+def _payload_bytes(value):
+    # Sizes a figure's property tree in place, without copying its arrays
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return _sampled_bytes(value.ravel(), value.size)
+        return value.nbytes
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sum(_payload_bytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return _sampled_bytes(value, len(value))
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return 8
+
+
+def estimate_size(obj):
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if hasattr(obj, 'data') and hasattr(obj, 'layout'):
+        # Plotly figure: the trace arrays dominate, the layout is small.
+        # _props is the trace's own property dict; to_plotly_json() would
+        # deep-copy every array.
+        return sum(_payload_bytes(trace._props) for trace in obj.data)
+    if isinstance(obj, dict):
+        return sum(estimate_size(v) for v in obj.values())
+    return sys.getsizeof(obj)
+
+
+class RerunLedger:
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.items = {}
+        self.started = time.perf_counter()
+        self.admission = None
+
+    def track(self, name, obj):
+        # Returns obj so calls can wrap expressions in place
+        self.items[name] = estimate_size(obj)
+        return obj
+
+    @property
+    def total_bytes(self):
+        return sum(self.items.values())
+
+    @property
+    def degraded(self):
+        return self.admission is not None and self.admission['mode'] == 'degraded'
+
+
+class SessionRegistry:
+    # Process-wide view of every session's last rerun, shared across sessions
+    def __init__(self):
+        self._lock = threading.Condition()
+        self._sessions = {}
+        self._heavy = {}
+
+    def _expire(self, now):
+        for session_id in [s for s, info in self._sessions.items() if now - info['updated'] > SESSION_TTL_S]:
+            del self._sessions[session_id]
+        for session_id in [s for s, started in self._heavy.items() if now - started > SLOT_TTL_S]:
+            del self._heavy[session_id]
+
+    def expansion(self, session_id):
+        # Bytes the session's last full rerun allocated per byte of filtered
+        # frame; a new session starts from the average of the others
+        with self._lock:
+            info = self._sessions.get(session_id)
+            if info:
+                return info['expansion']
+            known = [s['expansion'] for s in self._sessions.values()]
+            return sum(known) / len(known) if known else 1.0
+
+    def admit(self, ledger, session_state_bytes=0):
+        # Decide how the rerun may render: 'full', 'queued' (full after
+        # waiting for a heavy slot) or 'degraded'. Call after tracking the
+        # rerun's filtered frame, which the projected session size scales.
+        start = time.perf_counter()
+        rss = process_rss()
+        projected_bytes = session_state_bytes + ledger.total_bytes * self.expansion(ledger.session_id)
+        with self._lock:
+            # A slot left over from an interrupted rerun of this session
+            self._heavy.pop(ledger.session_id, None)
+            self._lock.notify_all()
+
+        if projected_bytes > SESSION_BUDGET_BYTES:
+            mode, reason = 'degraded', "session over its memory budget"
+        elif rss is not None and rss >= BUDGET_BYTES:
+            mode, reason = 'degraded', "process over its memory budget"
+        elif rss is None or rss < SOFT_FRACTION * BUDGET_BYTES:
+            mode, reason = 'full', None
+        else:
+            with self._lock:
+                deadline = time.monotonic() + QUEUE_TIMEOUT_S
+                while True:
+                    self._expire(time.time())
+                    if len(self._heavy) < MAX_HEAVY_RERUNS:
+                        self._heavy[ledger.session_id] = time.time()
+                        mode, reason = 'queued', "process near its memory budget"
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        mode, reason = 'degraded', "no heavy rerun slot available"
+                        break
+                    self._lock.wait(remaining)
+
+        ledger.admission = {
+            'mode': mode,
+            'reason': reason,
+            'waited_s': round(time.perf_counter() - start, 3),
+            'rss_bytes': rss,
+            'projected_bytes': int(projected_bytes),
+        }
+        ledger.items['session_state'] = session_state_bytes
+        return ledger.admission
+
+    def finish(self, ledger):
+        now = time.time()
+        rerun_bytes = ledger.total_bytes - ledger.items.get('session_state', 0)
+        filtered_bytes = ledger.items.get('filtered_df', 0)
+        # Only full renders show what the session's charts cost; degraded ones
+        # are smaller by design and would flip the next rerun back to full
+        expansion = self.expansion(ledger.session_id)
+        if filtered_bytes and not ledger.degraded:
+            expansion = rerun_bytes / filtered_bytes
+        with self._lock:
+            previous = self._sessions.get(ledger.session_id, {})
+            self._sessions[ledger.session_id] = {
+                'session_bytes': ledger.total_bytes,
+                'rerun_bytes': rerun_bytes,
+                'peak_rerun_bytes': max(previous.get('peak_rerun_bytes', 0), rerun_bytes),
+                'reruns': previous.get('reruns', 0) + 1,
+                'expansion': expansion,
+                'last_mode': ledger.admission['mode'] if ledger.admission else 'full',
+                'rerun_seconds': round(time.perf_counter() - ledger.started, 3),
+                'updated': now,
+            }
+            if self._heavy.pop(ledger.session_id, None) is not None:
+                self._lock.notify_all()
+            self._expire(now)
+
+    def snapshot(self):
+        with self._lock:
+            sessions = dict(self._sessions)
+            heavy = len(self._heavy)
+        rss = process_rss()
+        peak = peak_rss()
+        return {
+            'process_rss_mb': round(rss / MB, 1) if rss is not None else None,
+            'peak_rss_mb': round(peak / MB, 1) if peak is not None else None,
+            'budget_mb': round(BUDGET_BYTES / MB, 1),
+            'soft_limit_mb': round(SOFT_FRACTION * BUDGET_BYTES / MB, 1),
+            'session_budget_mb': round(SESSION_BUDGET_BYTES / MB, 1),
+            'active_sessions': len(sessions),
+            'tracked_session_mb': round(sum(s['session_bytes'] for s in sessions.values()) / MB, 2),
+            'heavy_reruns_running': heavy,
+            'degraded_sessions': sum(1 for s in sessions.values() if s['last_mode'] == 'degraded'),
+        }
+
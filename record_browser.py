@@ -0,0 +1,99 @@
+# Social Media Analytics - Record Browser
+# DataSculpt Hackathon 2025
+#
+# Paginated access to the raw records behind the charts. Sorting uses one
+# ascending argsort per column, computed once and kept in a small LRU cache;
+# descending pages walk the same order backwards, so no second array is
+# stored. A page is found by walking the order in fixed-size chunks against
+# the filter mask and keeping only the rows that land on the requested page.
+# Memory per request depends on the chunk and page size, not on how many rows
+# pass the filters, and only the projected columns of the visible rows are
+# materialized.
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+PAGE_SIZES = [25, 50, 100, 250]
+SCAN_CHUNK = 65536
+# Sort orders kept at once, one per column
+MAX_SORT_COLUMNS = 8
+
+
+class SortIndex:
+    # Cached ascending sort orders (row positions) per column, least recently
+    # used first out. Only the orders are kept; the caller passes the column.
+    def __init__(self, max_columns=MAX_SORT_COLUMNS):
+        self.max_columns = max_columns
+        self._orders = OrderedDict()
+        self._lock = threading.Lock()
+
+    def order(self, column, values):
+        # (positions in ascending order with missing values last, number of
+        # non-missing values) for `values`, the named column
+        with self._lock:
+            entry = self._orders.get(column)
+            if entry is not None and len(entry[0]) == len(values):
+                self._orders.move_to_end(column)
+                return entry
+        values = values.reset_index(drop=True)
+        order = values.sort_values(kind='stable', na_position='last').index.to_numpy()
+        dtype = np.int32 if len(order) < 2 ** 31 else np.int64
+        entry = (order.astype(dtype), int(values.notna().sum()))
+        with self._lock:
+            self._orders[column] = entry
+            while len(self._orders) > self.max_columns:
+                self._orders.popitem(last=False)
+        return entry
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(order.nbytes for order, _ in self._orders.values())
+
+
+def _order_blocks(order, n_valid, descending, chunk):
+    # Chunks of `order`; descending walks the non-missing part backwards and
+    # keeps missing values last
+    if not descending:
+        for c0 in range(0, len(order), chunk):
+            yield order[c0:c0 + chunk]
+        return
+    for c1 in range(n_valid, 0, -chunk):
+        yield order[max(0, c1 - chunk):c1][::-1]
+    for c0 in range(n_valid, len(order), chunk):
+        yield order[c0:c0 + chunk]
+
+
+def page_positions(mask, start, size, order=None, n_valid=None, descending=False, chunk=SCAN_CHUNK):
+    # Positions of the filtered rows [start, start + size) in `order`
+    # (natural row order when None)
+    n = len(mask)
+    if order is None:
+        blocks = (np.arange(c0, min(c0 + chunk, n)) for c0 in range(0, n, chunk))
+    else:
+        blocks = _order_blocks(order, len(order) if n_valid is None else n_valid, descending, chunk)
+    pages = []
+    seen = 0
+    for block in blocks:
+        hits = block[mask[block]]
+        if seen + len(hits) > start:
+            pages.append(hits[max(0, start - seen):start + size - seen])
+        seen += len(hits)
+        if seen >= start + size:
+            break
+    return np.concatenate(pages) if pages else np.empty(0, dtype=np.int64)
+
+
+def fetch_page(df, mask, page, page_size, columns, sort_index=None, sort_column=None, descending=False):
+    # Returns the projected rows of one page (0-based) and the filtered row count
+    total = int(np.count_nonzero(mask))
+    order, n_valid = sort_index.order(sort_column, df[sort_column]) if sort_column is not None else (None, None)
+    positions = page_positions(mask, page * page_size, page_size, order, n_valid, descending)
+    col_idx = df.columns.get_indexer(columns)
+    return df.iloc[positions, col_idx], total
+
+
+def n_pages(total, page_size):
+    return max(1, -(-total // page_size))
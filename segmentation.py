@@ -0,0 +1,169 @@
+# Social Media Analytics - User Segmentation
+# DataSculpt Hackathon 2025
+#
+# Mini-batch k-means over standardized float32 behaviour features. The CSV is
+# streamed in chunks (only the feature columns, read as float32), so fitting
+# never holds a full float64 copy of the data. Fits run in a background
+# thread and the centroids and per-row assignments are cached per dataset
+# version, in memory and as .npz files on disk.
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from dashboard_data import DATA_PATH
+
+SEGMENT_FEATURES = ['Total Time Spent', 'Number of Sessions', 'Engagement', 'Scroll Rate',
+                    'Self Control', 'Addiction Level', 'ProductivityLoss']
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.segment_cache')
+
+CHUNK_SIZE = 200_000
+BATCH_SIZE = 4096
+N_EPOCHS = 3
+INIT_SAMPLE = 10_000
+
+
+def iter_chunks(path=DATA_PATH, chunk_size=CHUNK_SIZE):
+    # float32 feature matrices, one per CSV chunk
+    reader = pd.read_csv(path, usecols=SEGMENT_FEATURES, dtype=np.float32, chunksize=chunk_size)
+    for chunk in reader:
+        yield chunk[SEGMENT_FEATURES].to_numpy(dtype=np.float32)
+
+
+def feature_stats(path=DATA_PATH, chunk_size=CHUNK_SIZE):
+    # Streaming mean and standard deviation; only the per-feature sums are float64
+    n = 0
+    total = np.zeros(len(SEGMENT_FEATURES))
+    total_sq = np.zeros(len(SEGMENT_FEATURES))
+    for X in iter_chunks(path, chunk_size):
+        n += len(X)
+        total += X.sum(axis=0, dtype=np.float64)
+        total_sq += np.square(X, dtype=np.float64).sum(axis=0)
+    mean = total / n
+    std = np.sqrt(np.maximum(total_sq / n - mean ** 2, 0))
+    std[std == 0] = 1
+    return n, mean.astype(np.float32), std.astype(np.float32)
+
+
+def _sq_distances(X, centers):
+    # ||x - c||^2 for every row and center without materializing X - c
+    return (np.square(X).sum(axis=1)[:, None]
+            - 2 * X @ centers.T
+            + np.square(centers).sum(axis=1)[None, :])
+
+
+def _kmeans_plus_plus(X, k, rng):
+    centers = [X[rng.integers(len(X))]]
+    closest = np.square(X - centers[0]).sum(axis=1)
+    for _ in range(1, k):
+        total = closest.sum()
+        idx = rng.choice(len(X), p=closest / total) if total > 0 else rng.integers(len(X))
+        centers.append(X[idx])
+        closest = np.minimum(closest, np.square(X - X[idx]).sum(axis=1))
+    return np.array(centers, dtype=np.float32)
+
+
+def minibatch_kmeans(path, k, mean, std, n_epochs=N_EPOCHS, batch_size=BATCH_SIZE,
+                     chunk_size=CHUNK_SIZE, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = None
+    counts = np.zeros(k)
+    for _ in range(n_epochs):
+        for X in iter_chunks(path, chunk_size):
+            X = (X - mean) / std
+            if centers is None:
+                sample = X[rng.permutation(len(X))[:INIT_SAMPLE]]
+                centers = _kmeans_plus_plus(sample, k, rng)
+            order = rng.permutation(len(X))
+            for start in range(0, len(X), batch_size):
+                batch = X[order[start:start + batch_size]]
+                labels = _sq_distances(batch, centers).argmin(axis=1)
+                # Per-center learning rate 1/count: each center is the running
+                # mean of every point ever assigned to it
+                batch_counts = np.bincount(labels, minlength=k)
+                batch_sums = np.stack([np.bincount(labels, weights=batch[:, j], minlength=k)
+                                       for j in range(batch.shape[1])], axis=1)
+                counts += batch_counts
+                seen = batch_counts > 0
+                centers[seen] += ((batch_sums[seen] - batch_counts[seen, None] * centers[seen])
+                                  / counts[seen, None]).astype(np.float32)
+    return centers
+
+
+def assign_segments(path, centers, mean, std, chunk_size=CHUNK_SIZE):
+    # One streaming pass; labels are stored as int8 (k is small)
+    labels = []
+    for X in iter_chunks(path, chunk_size):
+        labels.append(_sq_distances((X - mean) / std, centers).argmin(axis=1).astype(np.int8))
+    return np.concatenate(labels)
+
+
+def describe_centers(centers):
+    # Short names from each centroid's most distinctive features (in std units)
+    names = []
+    for i, center in enumerate(centers):
+        top = np.argsort(-np.abs(center))[:2]
+        traits = [f"{'high' if center[j] > 0 else 'low'} {SEGMENT_FEATURES[j]}" for j in top]
+        names.append(f"Segment {i + 1}: {', '.join(traits)}")
+    return names
+
+
+class Segmentation:
+    def __init__(self, version, centers, mean, std, labels):
+        self.version = version
+        self.centers = centers
+        self.mean = mean
+        self.std = std
+        self.labels = labels
+        self.names = describe_centers(centers)
+
+
+def _cache_path(version, k, seed):
+    return os.path.join(CACHE_DIR, f"segments_{version}_k{k}_s{seed}.npz")
+
+
+def fit_segmentation(version, k, path=DATA_PATH, seed=0, use_disk_cache=True):
+    cache_path = _cache_path(version, k, seed)
+    if use_disk_cache and os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            return Segmentation(version, cached['centers'], cached['mean'], cached['std'], cached['labels'])
+
+    _, mean, std = feature_stats(path)
+    centers = minibatch_kmeans(path, k, mean, std, seed=seed)
+    labels = assign_segments(path, centers, mean, std)
+    if use_disk_cache:
+        # The disk cache is an optimization; a read-only or full disk must not
+        # fail the fit. Write under a temporary name so readers never see a
+        # partial file.
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            np.savez(tmp_path, centers=centers, mean=mean, std=std, labels=labels)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    return Segmentation(version, centers, mean, std, labels)
+
+
+class SegmentationJobs:
+    # Background fits, one per (dataset version, k, seed), shared across sessions
+    def __init__(self, path=DATA_PATH):
+        self.path = path
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='segmentation')
+        self.futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, version, k, seed=0):
+        key = (version, k, seed)
+        with self._lock:
+            future = self.futures.get(key)
+            if future is None or (future.done() and future.exception() is not None):
+                future = self.executor.submit(fit_segmentation, version, k, self.path, seed)
+                self.futures[key] = future
+            return future